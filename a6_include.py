@@ -5,6 +5,16 @@
 #              are available and how they're implemented.
 #              Don't modify the contents of this file.
 
+import random
+import secrets
+import time
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional; batch hashing falls back to the scalar functions
+    np = None
+
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -19,6 +29,9 @@ class DynamicArray:
     append, pop, swap, get_at_index, set_at_index, length
     """
 
+    # No per-instance __dict__; hash maps allocate these by the thousand
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
@@ -78,6 +91,64 @@ class DynamicArray:
         return len(self._data)
 
 
+class BucketArray(DynamicArray):
+    """
+    Dynamic Array of hash table buckets that can be emptied in O(1).
+    Every slot records the epoch it was last set in, and clear starts a new
+    epoch: slots set in an earlier one read as None until they are set again.
+    The objects they held are only released once their slots are reused.
+    """
+
+    __slots__ = ('_epochs', '_epoch')
+
+    def __init__(self, capacity: int = 0) -> None:
+        """Initialize new bucket array holding capacity empty (None) buckets."""
+        self._data = [None] * capacity
+        self._epochs = [0] * capacity
+        self._epoch = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return str([self.get_at_index(i) for i in range(self.length())])
+
+    def append(self, value: object) -> None:
+        """Add new element at the end of the array."""
+        self._data.append(value)
+        self._epochs.append(self._epoch)
+
+    def pop(self):
+        """Remove element from end of the array and return it."""
+        value = self.get_at_index(self.length() - 1)
+        self._data.pop()
+        self._epochs.pop()
+        return value
+
+    def swap(self, i: int, j: int) -> None:
+        """Swap two elements in array given their indices."""
+        value = self.get_at_index(i)
+        self.set_at_index(i, self.get_at_index(j))
+        self.set_at_index(j, value)
+
+    def get_at_index(self, index: int):
+        """Return value of element at a given index (None if cleared since it was set)."""
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        if self._epochs[index] != self._epoch:
+            return None
+        return self._data[index]
+
+    def set_at_index(self, index: int, value: object) -> None:
+        """Set value of element at a given index."""
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        self._data[index] = value
+        self._epochs[index] = self._epoch
+
+    def clear(self) -> None:
+        """Empty every bucket in O(1) by starting a new epoch."""
+        self._epoch += 1
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -96,6 +167,481 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# Number of keys packed into one code point matrix by the batch hash functions.
+# Bounds the temporary matrix to HASH_MANY_CHUNK * (longest key) * 4 bytes.
+HASH_MANY_CHUNK = 1 << 16
+
+
+def _code_points(keys) -> "np.ndarray":
+    """
+    Pack a sequence of strings into a (len(keys), longest key) uint32 matrix of
+    code points. Shorter keys are padded with zeros, which add nothing to either
+    sample hash function.
+    """
+    packed = np.ascontiguousarray(keys, dtype=str)
+    width = packed.dtype.itemsize // 4
+    return packed.reshape(-1).view(np.uint32).reshape(packed.size, width)
+
+
+def _as_sequence(keys):
+    """Return keys as something that supports len() and slicing."""
+    if isinstance(keys, (list, tuple)) or (np is not None and isinstance(keys, np.ndarray)):
+        return keys
+    return list(keys)
+
+
+def hash_many_1(keys) -> "np.ndarray":
+    """
+    Batch version of hash_function_1. Returns an int64 array holding
+    hash_function_1(key) for every key, in order (a list if NumPy is unavailable).
+    """
+    keys = _as_sequence(keys)
+    if np is None:
+        return [hash_function_1(key) for key in keys]
+
+    hashes = np.empty(len(keys), dtype=np.int64)
+    for start in range(0, len(keys), HASH_MANY_CHUNK):
+        codes = _code_points(keys[start:start + HASH_MANY_CHUNK])
+        hashes[start:start + codes.shape[0]] = codes.sum(axis=1, dtype=np.int64)
+    return hashes
+
+
+def hash_many_2(keys) -> "np.ndarray":
+    """
+    Batch version of hash_function_2. Returns an int64 array holding
+    hash_function_2(key) for every key, in order (a list if NumPy is unavailable).
+    Exact while a hash fits in 64 bits, i.e. for keys shorter than about 4 million characters.
+    """
+    keys = _as_sequence(keys)
+    if np is None:
+        return [hash_function_2(key) for key in keys]
+
+    hashes = np.empty(len(keys), dtype=np.int64)
+    for start in range(0, len(keys), HASH_MANY_CHUNK):
+        codes = _code_points(keys[start:start + HASH_MANY_CHUNK])
+        # Position weighted sum: the letter at index i is multiplied by i + 1
+        weights = np.arange(1, codes.shape[1] + 1, dtype=np.int64)
+        hashes[start:start + codes.shape[0]] = codes.astype(np.int64) @ weights
+    return hashes
+
+
+# Let callers holding only the scalar function find its batch version
+hash_function_1.hash_many = hash_many_1
+hash_function_2.hash_many = hash_many_2
+
+
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def mix_hash(hash: int) -> int:
+    """
+    Scramble a hash (taken modulo 2 ** 64) so that every one of its bits affects the
+    low bits of the result, using the MurmurHash3 64-bit finalizer. Power of two tables
+    index by the low bits only, which weak functions like hash_function_1 barely vary.
+    The mix is one-to-one, so mixed hashes still tell different keys apart.
+    """
+    hash &= MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xFF51AFD7ED558CCD) & MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xC4CEB9FE1A85EC53) & MASK_64
+    hash ^= hash >> 33
+    return hash
+
+
+def _mix_hashes(hashes: "np.ndarray") -> "np.ndarray":
+    """Batch version of mix_hash over an integer array, relying on uint64 wraparound."""
+    hashes = hashes.astype(np.uint64)
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= np.uint64(0xFF51AFD7ED558CCD)
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= np.uint64(0xC4CEB9FE1A85EC53)
+    hashes ^= hashes >> np.uint64(33)
+    return hashes
+
+
+def hash_keys(function, keys, mix: bool = False) -> list:
+    """
+    Hash every key in keys with the given hash function and return the hashes as a
+    list of ints, passed through mix_hash if mix is True. Uses the function's batch
+    version (its hash_many attribute) when it has one, otherwise calls the function
+    once per key.
+    """
+    hash_many = getattr(function, 'hash_many', None)
+    if hash_many is None:
+        hashes = [function(key) for key in keys]
+    else:
+        hashes = hash_many(keys)
+        if np is not None and isinstance(hashes, np.ndarray):
+            return (_mix_hashes(hashes) if mix else hashes).tolist()
+
+    return [mix_hash(hash) for hash in hashes] if mix else list(hashes)
+
+
+# ------------- Seeded hash functions (both HashMaps) ------------- #
+#
+# Unlike the sample functions above, these spread similar keys (anagrams, shared
+# prefixes, short keys) over the whole 64-bit range, and they take a seed. Give each
+# map its own randomly seeded function, e.g. HashMap(11, seeded_siphash()), so keys
+# chosen to collide under one seed do not collide in another map. Keys are hashed as
+# their UTF-8 bytes.
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+
+def _utf8(key: str) -> bytes:
+    """Return the bytes a seeded hash function hashes for key."""
+    return key.encode('utf-8', 'surrogatepass')
+
+
+def _byte_matrix(keys, multiple: int = 1) -> tuple:
+    """
+    Pack a sequence of strings into a zero-padded uint8 matrix of their UTF-8 bytes, one
+    row per key, with room for at least one byte past the longest key and a width that is
+    a multiple of the given number. Returns the matrix and an int64 array of key lengths.
+    """
+    encoded = [_utf8(key) for key in keys]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    longest = int(lengths.max()) if len(encoded) else 0
+    width = (longest // multiple + 1) * multiple
+
+    matrix = np.zeros((len(encoded), width), dtype=np.uint8)
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    rows = np.repeat(np.arange(len(encoded)), lengths)
+    matrix[rows, np.arange(data.size) - np.repeat(starts, lengths)] = data
+    return matrix, lengths
+
+
+def fnv1a_hash(key: str, seed: int = 0) -> int:
+    """64-bit FNV-1a hash of key, with the seed folded into the offset basis."""
+    hash = FNV_OFFSET ^ (seed & MASK_64)
+    for byte in _utf8(key):
+        hash = ((hash ^ byte) * FNV_PRIME) & MASK_64
+    return hash
+
+
+def fnv1a_hash_many(keys, seed: int = 0) -> "np.ndarray":
+    """
+    Batch version of fnv1a_hash. Returns a uint64 array holding fnv1a_hash(key, seed)
+    for every key, in order (a list if NumPy is unavailable).
+    """
+    keys = _as_sequence(keys)
+    if np is None:
+        return [fnv1a_hash(key, seed) for key in keys]
+
+    hashes = np.empty(len(keys), dtype=np.uint64)
+    prime = np.uint64(FNV_PRIME)
+    for start in range(0, len(keys), HASH_MANY_CHUNK):
+        matrix, lengths = _byte_matrix(keys[start:start + HASH_MANY_CHUNK])
+        hash = np.full(len(lengths), FNV_OFFSET ^ (seed & MASK_64), dtype=np.uint64)
+        # One byte position at a time, across every key still that long
+        for i in range(matrix.shape[1] - 1):
+            hash = np.where(lengths > i, (hash ^ matrix[:, i]) * prime, hash)
+        hashes[start:start + len(lengths)] = hash
+    return hashes
+
+
+def _rotl(x: int, bits: int) -> int:
+    """Rotate a 64-bit integer left by the given number of bits."""
+    return ((x << bits) | (x >> (64 - bits))) & MASK_64
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> tuple:
+    """Apply the given number of SipRounds to the SipHash state."""
+    for _ in range(rounds):
+        v0 = (v0 + v1) & MASK_64
+        v1 = _rotl(v1, 13) ^ v0
+        v0 = _rotl(v0, 32)
+        v2 = (v2 + v3) & MASK_64
+        v3 = _rotl(v3, 16) ^ v2
+        v0 = (v0 + v3) & MASK_64
+        v3 = _rotl(v3, 21) ^ v0
+        v2 = (v2 + v1) & MASK_64
+        v1 = _rotl(v1, 17) ^ v2
+        v2 = _rotl(v2, 32)
+    return v0, v1, v2, v3
+
+
+def _siphash_bytes(data: bytes, k0: int, k1: int) -> int:
+    """SipHash-2-4 of data under the 128-bit key (k0, k1)."""
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    # Whole 8-byte words, then a last word of the remaining bytes topped by the length
+    tail = len(data) & ~7
+    words = [int.from_bytes(data[i:i + 8], 'little') for i in range(0, tail, 8)]
+    words.append(((len(data) & 0xFF) << 56) | int.from_bytes(data[tail:], 'little'))
+    for word in words:
+        v3 ^= word
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+
+    v2 ^= 0xFF
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def siphash(key: str, seed: int = 0) -> int:
+    """SipHash-2-4 of key, keyed by the low 128 bits of the seed."""
+    return _siphash_bytes(_utf8(key), seed & MASK_64, (seed >> 64) & MASK_64)
+
+
+def _rotl_array(x: "np.ndarray", bits: int) -> "np.ndarray":
+    """Batch version of _rotl over a uint64 array."""
+    return (x << np.uint64(bits)) | (x >> np.uint64(64 - bits))
+
+
+def _sip_rounds_array(v0, v1, v2, v3, rounds: int) -> tuple:
+    """Batch version of _sip_rounds over uint64 arrays, relying on uint64 wraparound."""
+    for _ in range(rounds):
+        v0 = v0 + v1
+        v1 = _rotl_array(v1, 13) ^ v0
+        v0 = _rotl_array(v0, 32)
+        v2 = v2 + v3
+        v3 = _rotl_array(v3, 16) ^ v2
+        v0 = v0 + v3
+        v3 = _rotl_array(v3, 21) ^ v0
+        v2 = v2 + v1
+        v1 = _rotl_array(v1, 17) ^ v2
+        v2 = _rotl_array(v2, 32)
+    return v0, v1, v2, v3
+
+
+def siphash_many(keys, seed: int = 0) -> "np.ndarray":
+    """
+    Batch version of siphash. Returns a uint64 array holding siphash(key, seed) for
+    every key, in order (a list if NumPy is unavailable).
+    """
+    keys = _as_sequence(keys)
+    if np is None:
+        return [siphash(key, seed) for key in keys]
+
+    k0, k1 = seed & MASK_64, (seed >> 64) & MASK_64
+    hashes = np.empty(len(keys), dtype=np.uint64)
+    for start in range(0, len(keys), HASH_MANY_CHUNK):
+        matrix, lengths = _byte_matrix(keys[start:start + HASH_MANY_CHUNK], 8)
+        count = len(lengths)
+
+        # The top byte of each key's last word holds its length
+        last_words = lengths // 8
+        matrix[np.arange(count), last_words * 8 + 7] = lengths & 0xFF
+        words = matrix.view('<u8')
+
+        v0 = np.full(count, k0 ^ 0x736F6D6570736575, dtype=np.uint64)
+        v1 = np.full(count, k1 ^ 0x646F72616E646F6D, dtype=np.uint64)
+        v2 = np.full(count, k0 ^ 0x6C7967656E657261, dtype=np.uint64)
+        v3 = np.full(count, k1 ^ 0x7465646279746573, dtype=np.uint64)
+
+        # One word position at a time, across every key with a word there
+        for i in range(words.shape[1]):
+            word = words[:, i]
+            active = last_words >= i
+            n0, n1, n2, n3 = _sip_rounds_array(v0, v1, v2, v3 ^ word, 2)
+            v0 = np.where(active, n0 ^ word, v0)
+            v1 = np.where(active, n1, v1)
+            v2 = np.where(active, n2, v2)
+            v3 = np.where(active, n3, v3)
+
+        v0, v1, v2, v3 = _sip_rounds_array(v0, v1, v2 ^ np.uint64(0xFF), v3, 4)
+        hashes[start:start + count] = v0 ^ v1 ^ v2 ^ v3
+    return hashes
+
+
+def seeded_fnv1a(seed: int = None):
+    """
+    Return a hash function (with a batch hash_many) computing fnv1a_hash under the given
+    seed, or under a fresh random 64-bit seed if none is given. Its seed attribute holds
+    the seed in use.
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    def fnv1a(key: str) -> int:
+        return fnv1a_hash(key, seed)
+
+    fnv1a.hash_many = lambda keys: fnv1a_hash_many(keys, seed)
+    fnv1a.seed = seed
+    return fnv1a
+
+
+def seeded_siphash(seed: int = None):
+    """
+    Return a hash function (with a batch hash_many) computing siphash under the given
+    seed, or under a fresh random 128-bit seed if none is given. Its seed attribute holds
+    the seed in use.
+    """
+    if seed is None:
+        seed = secrets.randbits(128)
+
+    def siphash24(key: str) -> int:
+        return siphash(key, seed)
+
+    siphash24.hash_many = lambda keys: siphash_many(keys, seed)
+    siphash24.seed = seed
+    return siphash24
+
+
+# Precomputed table capacities for growing prime-sized tables: primes spaced about
+# sqrt(2) apart, so a doubled table lands at most ~41% above twice its old size and
+# no prime has to be searched for at resize time.
+GROWTH_PRIMES = (
+    3, 5, 7, 11, 17, 29, 41, 59, 83, 127, 179, 257, 367, 521, 739, 1049, 1483, 2099,
+    2969, 4201, 5953, 8419, 11909, 16843, 23819, 33703, 47681, 67433, 95369, 134873,
+    190753, 269779, 381527, 539573, 763073, 1079153, 1526167, 2158333, 3052351, 4316681,
+    6104713, 8633371, 12209437, 17266757, 24418909, 34533553, 48837829, 69067121,
+    97675667, 138134257, 195351361, 276268589, 390702797, 552537199, 781405601,
+    1105074403, 1562811269, 2210148893, 3125622541, 4420297793, 6251245129,
+    8840595661, 12502490293, 17681191357, 25004980669, 35362382789, 50009961341,
+)
+GROWTH_PRIME_SET = frozenset(GROWTH_PRIMES)
+
+
+def next_growth_prime(capacity: int) -> int:
+    """
+    Return the smallest prime in GROWTH_PRIMES that is at least capacity,
+    or None if capacity is beyond the table.
+    """
+    index = bisect_left(GROWTH_PRIMES, capacity)
+    return GROWTH_PRIMES[index] if index < len(GROWTH_PRIMES) else None
+
+
+# Number of buckets stats() examines by default; smaller tables are examined in full
+STATS_SAMPLE = 1024
+
+# Buckets a put sweeps for expired entries once the map holds entries with a time-to-live,
+# and buckets expire() sweeps between checks of its time budget
+EXPIRE_STEP = 4
+EXPIRE_CHECK = 64
+
+
+def sample_indices(capacity: int, sample: int = STATS_SAMPLE):
+    """
+    Return the bucket indices for stats() to examine: every index when sample is None
+    or covers the whole table, otherwise sample distinct indices chosen at random.
+    """
+    if sample is None or sample >= capacity:
+        return range(capacity)
+    return random.sample(range(capacity), sample)
+
+
+def length_summary(lengths) -> dict:
+    """
+    Return how many lengths were given, their histogram (length -> count, in
+    ascending order of length), their maximum and their mean.
+    """
+    histogram = {}
+    for length in lengths:
+        histogram[length] = histogram.get(length, 0) + 1
+
+    count = sum(histogram.values())
+    return {
+        'count': count,
+        'histogram': dict(sorted(histogram.items())),
+        'max': max(histogram, default=0),
+        'mean': sum(length * n for length, n in histogram.items()) / count if count else 0.0,
+    }
+
+
+# Operations that profiling hooks are told about
+HOOKED_OPERATIONS = ('put', 'get', 'contains_key', 'remove', 'resize_table', 'clear')
+
+# The hooked operations that take a key, and whose probes are counted
+KEYED_OPERATIONS = ('put', 'get', 'contains_key', 'remove')
+
+
+class OperationEvent:
+    """
+    What a profiling hook is told about one hash map operation: its name, the key (None
+    for resize_table and clear), its duration in seconds, the number of buckets or nodes
+    its lookup visits (None for resize_table and clear) and whether it resized the table.
+    """
+    __slots__ = ('operation', 'key', 'seconds', 'probes', 'resized')
+
+    def __init__(self, operation: str, key: str, seconds: float, probes: int, resized: bool) -> None:
+        self.operation = operation
+        self.key = key
+        self.seconds = seconds
+        self.probes = probes
+        self.resized = resized
+
+    def __str__(self) -> str:
+        return (self.operation + '(' + str(self.key) + '): ' + str(self.seconds) + 's, ' +
+                str(self.probes) + ' probes' + (', resized' if self.resized else ''))
+
+
+class OperationCounter:
+    """
+    A ready-made profiling hook that totals, per operation, the number of calls, their
+    seconds and probes, and the number of calls that resized the table.
+    """
+    __slots__ = ('totals',)
+
+    def __init__(self) -> None:
+        self.totals = {}
+
+    def __call__(self, event: OperationEvent) -> None:
+        totals = self.totals.get(event.operation)
+        if totals is None:
+            totals = self.totals[event.operation] = {'calls': 0, 'seconds': 0.0, 'probes': 0, 'resizes': 0}
+        totals['calls'] += 1
+        totals['seconds'] += event.seconds
+        totals['probes'] += event.probes or 0
+        totals['resizes'] += event.resized
+
+
+def instrument(hash_map, hooks: list) -> None:
+    """
+    Shadow each of the hash map's HOOKED_OPERATIONS with an instance attribute that times
+    the operation and passes an OperationEvent to every hook in hooks. The hash map must
+    provide _probe_length(key) and count its resizes in _resizes. The reported time
+    covers only the operation itself, not the probe count or the hooks. The class
+    methods are left as they are, so maps without hooks pay nothing.
+    """
+    for name in HOOKED_OPERATIONS:
+        setattr(hash_map, name, _hooked(hash_map, name, getattr(type(hash_map), name), hooks))
+
+
+def uninstrument(hash_map) -> None:
+    """Remove the instance attributes added by instrument, restoring the plain methods."""
+    for name in HOOKED_OPERATIONS:
+        hash_map.__dict__.pop(name, None)
+
+
+def _hooked(hash_map, name: str, method, hooks: list):
+    """Return the instrumented version of one operation of the hash map."""
+    clock = time.perf_counter
+
+    if name in KEYED_OPERATIONS:
+        def operation(key, *args, **kwargs):
+            # Probes are counted by a separate lookup, before the operation changes the table.
+            # It is done before the clock starts, so the time covers the operation alone
+            probes = hash_map._probe_length(key)
+            resizes = hash_map._resizes
+            start = clock()
+            result = method(hash_map, key, *args, **kwargs)
+            seconds = clock() - start
+            event = OperationEvent(name, key, seconds, probes, hash_map._resizes != resizes)
+            for hook in hooks:
+                hook(event)
+            return result
+    else:
+        def operation(*args, **kwargs):
+            resizes = hash_map._resizes
+            start = clock()
+            result = method(hash_map, *args, **kwargs)
+            seconds = clock() - start
+            event = OperationEvent(name, None, seconds, None, hash_map._resizes != resizes)
+            for hook in hooks:
+                hook(event)
+            return result
+
+    return operation
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +649,19 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    __slots__ = ('key', 'value', 'next', 'hash', 'expires')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None,
+                 expires: float = None) -> None:
+        """
+        Initialize node given a key, value and (optionally) the key's full hash and the
+        clock time at which the pair expires.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
+        self.expires = expires
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -119,6 +673,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -144,6 +700,8 @@ class LinkedList:
     Supported methods are: insert, remove, contains, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +726,22 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None, expires: float = None) -> None:
+        """Insert new node at front of the list, caching the key's hash and expiry if given."""
+        self._head = SLNode(key, value, self._head, hash, expires)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If the key's hash is given, nodes with a different cached hash are
+        skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +752,15 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If the key's hash is given, nodes with a different cached hash are
+        skipped without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
@@ -206,14 +770,82 @@ class LinkedList:
         return self._size
 
 
+class SortedBucket:
+    """
+    Drop-in replacement for a LinkedList bucket that has grown long. Its nodes are kept
+    in (hash, key) order, so insert, remove and contains find a key by binary search in
+    O(log n) instead of walking the chain. Keys that share a hash are ordered by the
+    keys themselves, so they must be comparable with each other (e.g. all str).
+    Supported methods are: insert, remove, contains, length, iterator
+    """
+
+    __slots__ = ('_order', '_nodes')
+
+    def __init__(self, nodes=()) -> None:
+        """Initialize the bucket with the given nodes, which must all cache their hash."""
+        self._nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+        self._order = [(node.hash, node.key) for node in self._nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SORTED [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """
+        Return an iterator over the nodes, in (hash, key) order. It runs over a copy, so
+        nodes may be removed meanwhile, as they may from a LinkedList being iterated.
+        """
+        return iter(tuple(self._nodes))
+
+    def insert(self, key: str, value: object, hash: int, expires: float = None) -> None:
+        """Insert a new node for a key that is not in the bucket."""
+        index = bisect_left(self._order, (hash, key))
+        self._order.insert(index, (hash, key))
+        self._nodes.insert(index, SLNode(key, value, None, hash, expires))
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove the node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        index = bisect_left(self._order, (hash, key))
+        if index < len(self._order) and self._order[index] == (hash, key):
+            del self._order[index]
+            del self._nodes[index]
+            return True
+        return False
+
+    def contains(self, key: str, hash: int) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        index = bisect_left(self._order, (hash, key))
+        if index < len(self._order) and self._order[index] == (hash, key):
+            return self._nodes[index]
+        return None
+
+    def search_length(self) -> int:
+        """Return the number of nodes a binary search of the bucket compares against."""
+        return len(self._order).bit_length()
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone', 'expires')
+
+    def __init__(self, key: str, value: object, hash: int = None, expires: float = None) -> None:
+        """
+        Initialize an entry for use in a hash map, caching the key's full hash, and
+        the clock time at which it expires if it has a time-to-live.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
+        self.expires = expires
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
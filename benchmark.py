@@ -0,0 +1,332 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Benchmark harness for the hash map implementations and the built-in dict.
+#              Each workload is generated up front as a fixed sequence of put/get/remove
+#              operations, so every map replays exactly the same operations. A timed pass
+#              records every operation's latency; a second pass under tracemalloc records
+#              peak memory, so tracing overhead never shows up in the timings.
+#
+# Usage:       python benchmark.py [--maps sc oa oa-linear dict] [--workloads uniform zipf]
+#                                  [--sizes 1000 10000] [--hash 1|2|fnv1a|siphash]
+#                                  [--json results.json]
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_soa
+from a6_include import hash_function_1, hash_function_2, seeded_fnv1a, seeded_siphash
+
+# Operation codes stored in a workload's op array
+PUT = 0
+GET = 1
+REMOVE = 2
+
+OP_NAMES = ('put', 'get', 'remove')
+
+
+class DictMap:
+    """The built-in dict behind the put/get/remove interface of the hash maps."""
+    __slots__ = ('_dict',)
+
+    def __init__(self) -> None:
+        self._dict = {}
+
+    def put(self, key: str, value: object) -> None:
+        self._dict[key] = value
+
+    def get(self, key: str) -> object:
+        return self._dict.get(key)
+
+    def remove(self, key: str) -> None:
+        self._dict.pop(key, None)
+
+    def get_size(self) -> int:
+        return len(self._dict)
+
+
+# Name -> factory taking the hash function, for every map that can be benchmarked.
+# A suffix names a non-default configuration: the probing strategy, power of two
+# capacities, or incremental resizing that moves 4 buckets per operation. Quadratic
+# probing needs prime capacities, so oa-pow2 probes linearly (triangular implies pow2).
+MAPS = {
+    'sc': lambda function: hash_map_sc.HashMap(11, function),
+    'sc-pow2': lambda function: hash_map_sc.HashMap(11, function, capacity_mode='pow2'),
+    'sc-step4': lambda function: hash_map_sc.HashMap(11, function, rehash_step=4),
+    'oa': lambda function: hash_map_oa.HashMap(11, function),
+    'oa-linear': lambda function: hash_map_oa.HashMap(11, function, probing='linear'),
+    'oa-double': lambda function: hash_map_oa.HashMap(11, function, probing='double'),
+    'oa-triangular': lambda function: hash_map_oa.HashMap(11, function, probing='triangular'),
+    'oa-pow2': lambda function: hash_map_oa.HashMap(11, function, probing='linear',
+                                                    capacity_mode='pow2'),
+    'oa-step4': lambda function: hash_map_oa.HashMap(11, function, rehash_step=4),
+    'soa': lambda function: hash_map_soa.HashMap(11, function),
+    'rh': lambda function: hash_map_rh.HashMap(11, function),
+    'dict': lambda function: DictMap(),
+}
+
+HASH_FUNCTIONS = {
+    '1': hash_function_1,
+    '2': hash_function_2,
+    'fnv1a': seeded_fnv1a(),
+    'siphash': seeded_siphash(),
+}
+
+DEFAULT_MAPS = ('sc', 'oa', 'dict')
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Exponent of the Zipf distribution used for skewed lookups
+ZIPF_EXPONENT = 1.1
+
+# Number of distinct keys sharing each set of letters in the anagram workload
+ANAGRAM_GROUP = 64
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def random_keys(count: int, rnd: random.Random) -> list:
+    """
+    Return count distinct random lowercase keys of 8 to 16 letters, in the order they
+    were drawn, so the same rnd state always gives the same list (a set's order would
+    depend on PYTHONHASHSEED).
+    """
+    keys = {}
+    while len(keys) < count:
+        keys[''.join(rnd.choice(LETTERS) for _ in range(rnd.randrange(8, 17)))] = None
+    return list(keys)
+
+
+def anagram_keys(count: int, rnd: random.Random) -> list:
+    """
+    Return count distinct keys in groups of ANAGRAM_GROUP anagrams. Keys in a group are
+    permutations of the same letters, so hash_function_1 (a plain sum of the letters)
+    gives the whole group a single hash.
+    """
+    keys = []
+    seen = set()
+    while len(keys) < count:
+        letters = [rnd.choice(LETTERS) for _ in range(12)]
+        group = 0
+        while group < ANAGRAM_GROUP and len(keys) < count:
+            rnd.shuffle(letters)
+            key = ''.join(letters)
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+                group += 1
+    return keys
+
+
+def fill_then_get(keys: list, lookups: list) -> tuple:
+    """Return the op and key sequences that put every key and then get every lookup."""
+    ops = array('b', [PUT]) * len(keys) + array('b', [GET]) * len(lookups)
+    return ops, keys + lookups
+
+
+def uniform_workload(size: int, rnd: random.Random) -> tuple:
+    """Put size keys, then get size keys drawn uniformly: half present, half missing."""
+    keys = random_keys(size * 2, rnd)
+    present, missing = keys[:size], keys[size:]
+    lookups = [rnd.choice(present) if rnd.random() < 0.5 else rnd.choice(missing)
+               for _ in range(size)]
+    return fill_then_get(present, lookups)
+
+
+def zipf_workload(size: int, rnd: random.Random) -> tuple:
+    """Put size keys, then get size keys drawn by a Zipf distribution over their ranks."""
+    keys = random_keys(size, rnd)
+    weights = [1 / rank ** ZIPF_EXPONENT for rank in range(1, size + 1)]
+    lookups = rnd.choices(keys, weights=weights, k=size)
+    return fill_then_get(keys, lookups)
+
+
+def anagram_workload(size: int, rnd: random.Random) -> tuple:
+    """Put size anagram-heavy keys, then get size of them drawn uniformly."""
+    keys = anagram_keys(size, rnd)
+    lookups = [rnd.choice(keys) for _ in range(size)]
+    return fill_then_get(keys, lookups)
+
+
+def insert_workload(size: int, rnd: random.Random) -> tuple:
+    """Put size new keys with a get of an already inserted key after every ninth put."""
+    keys = random_keys(size, rnd)
+    ops, op_keys = array('b'), []
+    for i, key in enumerate(keys):
+        ops.append(PUT)
+        op_keys.append(key)
+        if i % 9 == 8:
+            ops.append(GET)
+            op_keys.append(keys[rnd.randrange(i + 1)])
+    return ops, op_keys
+
+
+def churn_workload(size: int, rnd: random.Random) -> tuple:
+    """
+    Put size keys, then size times remove a random present key and put a new one, so
+    the map stays the same size while entries keep being deleted and replaced.
+    """
+    keys = random_keys(size * 2, rnd)
+    live, fresh = keys[:size], keys[size:]
+    ops = array('b', [PUT]) * size
+    op_keys = list(live)
+    for key in fresh:
+        i = rnd.randrange(size)
+        ops.append(REMOVE)
+        op_keys.append(live[i])
+        ops.append(PUT)
+        op_keys.append(key)
+        live[i] = key
+    return ops, op_keys
+
+
+# Name -> (generator, hash function used unless --hash overrides it)
+WORKLOADS = {
+    'uniform': (uniform_workload, hash_function_2),
+    'zipf': (zipf_workload, hash_function_2),
+    'anagram': (anagram_workload, hash_function_1),
+    'insert': (insert_workload, hash_function_2),
+    'churn': (churn_workload, hash_function_2),
+}
+
+
+def replay(m, ops: array, keys: list, latencies: array = None) -> float:
+    """
+    Apply the operations to map m and return the elapsed seconds. When latencies is
+    given, each operation's own duration in nanoseconds is appended to it.
+    """
+    put, get, remove = m.put, m.get, m.remove
+    clock = time.perf_counter_ns
+
+    if latencies is None:
+        start = time.perf_counter()
+        for op, key in zip(ops, keys):
+            if op == GET:
+                get(key)
+            elif op == PUT:
+                put(key, None)
+            else:
+                remove(key)
+        return time.perf_counter() - start
+
+    record = latencies.append
+    for op, key in zip(ops, keys):
+        start = clock()
+        if op == GET:
+            get(key)
+        elif op == PUT:
+            put(key, None)
+        else:
+            remove(key)
+        record(clock() - start)
+    return sum(latencies) / 1e9
+
+
+def percentile(ordered: list, fraction: float) -> int:
+    """Return the value at the given fraction (0 to 1) of an ascending list."""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(map_name: str, workload: str, size: int, function=None, seed: int = 261,
+        memory: bool = True) -> dict:
+    """
+    Run one workload of the given size against one map and return its results: ops/sec
+    from an untimed-per-operation pass, latency percentiles in nanoseconds from a pass
+    that times every operation, and (if memory) peak traced bytes from a third pass.
+    """
+    generate, default_function = WORKLOADS[workload]
+    function = function or default_function
+    ops, keys = generate(size, random.Random(seed))
+    factory = MAPS[map_name]
+
+    elapsed = replay(factory(function), ops, keys)
+
+    latencies = array('q')
+    replay(factory(function), ops, keys, latencies)
+    ordered = sorted(latencies)
+
+    result = {
+        'map': map_name,
+        'workload': workload,
+        'size': size,
+        'hash': function.__name__,
+        'ops': len(ops),
+        'counts': {name: ops.count(code) for code, name in enumerate(OP_NAMES)},
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(len(ops) / elapsed) if elapsed else None,
+        'p50_ns': percentile(ordered, 0.50),
+        'p99_ns': percentile(ordered, 0.99),
+        'max_ns': ordered[-1],
+    }
+
+    if memory:
+        tracemalloc.start()
+        try:
+            replay(factory(function), ops, keys)
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+def benchmark(maps=DEFAULT_MAPS, workloads=tuple(WORKLOADS), sizes=DEFAULT_SIZES,
+              function=None, seed: int = 261, memory: bool = True, log=None) -> list:
+    """Run every workload at every size against every map and return the result dicts."""
+    results = []
+    for workload in workloads:
+        for size in sizes:
+            for name in maps:
+                result = run(name, workload, size, function, seed, memory)
+                results.append(result)
+                if log is not None:
+                    log(result)
+    return results
+
+
+def print_result(r: dict) -> None:
+    """Print one result as a row of the results table."""
+    peak = r.get('peak_bytes')
+    print(f"{r['workload']:<9}{r['size']:>10}{r['map']:>14}{r['ops_per_sec']:>12}"
+          f"{r['p50_ns']:>10}{r['p99_ns']:>10}{r['max_ns']:>12}"
+          f"{'-' if peak is None else peak:>14}", flush=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the hash maps against dict.')
+    parser.add_argument('--maps', nargs='+', choices=sorted(MAPS), default=list(DEFAULT_MAPS))
+    parser.add_argument('--workloads', nargs='+', choices=sorted(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='number of keys per run, e.g. 1000 up to 10000000')
+    parser.add_argument('--hash', choices=sorted(HASH_FUNCTIONS),
+                        help="hash function for every workload (default: the workload's own)")
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory pass')
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    print(f"{'workload':<9}{'size':>10}{'map':>14}{'ops/sec':>12}"
+          f"{'p50 ns':>10}{'p99 ns':>10}{'max ns':>12}{'peak bytes':>14}")
+    results = benchmark(args.maps, args.workloads, args.sizes,
+                        HASH_FUNCTIONS.get(args.hash), args.seed, not args.no_memory, print_result)
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({
+                'python': sys.version,
+                'platform': platform.platform(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'seed': args.seed,
+                'results': results,
+            }, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+# Name: Dominic Fantauzzo
+# OSU Email: fantauzd@oregonstate.edu
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Bounded caches built on the hash maps. The map takes each key to a node that
+#              is also linked into an intrusive eviction order: one doubly linked recency
+#              list for LRUCache, or a doubly linked list of frequency buckets (each its own
+#              recency list) for LFUCache. Lookups, updates and evicting the least recently
+#              or least frequently used entry then all run in O(1). A cache may be bounded
+#              by its number of entries, its total size in bytes, or both, and counts its
+#              hits, misses and evictions so caches can be sized by measurement.
+
+import sys
+from abc import ABC, abstractmethod
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_1, hash_function_2
+
+# Name -> hash map class a cache can be built on
+MAP_TYPES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+}
+
+
+def default_sizeof(key: str, value: object) -> int:
+    """Return the bytes charged for an entry: the shallow sizes of its key and value."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class CacheNode:
+    """Entry of a cache, linked into its eviction order."""
+    __slots__ = ('key', 'value', 'size', 'prev', 'next', 'bucket')
+
+    def __init__(self, key: str = None, value: object = None, size: int = 0) -> None:
+        self.key = key
+        self.value = value
+        self.size = size
+        # Neighbours in the recency list; a sentinel links to itself when the list is empty
+        self.prev = self
+        self.next = self
+        # FrequencyBucket holding the node (LFUCache only)
+        self.bucket = None
+
+
+def _link_before(node: CacheNode, successor: CacheNode) -> None:
+    """Insert node into a recency list just before successor."""
+    node.prev = successor.prev
+    node.next = successor
+    successor.prev.next = node
+    successor.prev = node
+
+
+def _unlink(node: CacheNode) -> None:
+    """Remove node from its recency list."""
+    node.prev.next = node.next
+    node.next.prev = node.prev
+    node.prev = node.next = node
+
+
+class Cache(ABC):
+    """
+    Base of the bounded caches: the map, the bounds, the counters and the public
+    operations. Subclasses keep the eviction order through _added, _touched, _removed
+    and _victim(keep), which returns the next entry to evict other than keep; each of
+    them must run in O(1).
+    """
+
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 sizeof: callable = default_sizeof,
+                 function: callable = hash_function_1,
+                 map_type: str = 'sc') -> None:
+        """
+        Initialize an empty cache holding at most max_entries entries and at most
+        max_bytes bytes, as charged by sizeof(key, value); either bound may be None
+        (unbounded), but not both. The entries are kept in a map_type ('sc' or 'oa')
+        HashMap using the given hash function.
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError('a cache needs max_entries, max_bytes or both')
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError('cache bounds must be positive')
+
+        self._map = MAP_TYPES[map_type](11, function)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_size(self) -> int:
+        """
+        Return number of entries in the cache
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Return total bytes charged for the entries in the cache
+        """
+        return self._bytes
+
+    def get(self, key: str):
+        """
+        Returns the value cached for the given key and marks it as used, or returns None
+        (counting a miss) if the key is not cached. Runs in O(1).
+        """
+        node = self._map.get(key)
+        if node is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._touched(node)
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is cached, otherwise False. Neither counts as a
+        hit or miss nor marks the key as used. Runs in O(1).
+        """
+        return self._map.contains_key(key)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Caches the value for the given key, marking it as used, then evicts entries until
+        the cache is within its bounds again. An entry too large for max_bytes on its own
+        is not cached (and any older value of its key is dropped). Runs in amortized O(1).
+        """
+        size = self._sizeof(key, value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            self.remove(key)
+            return
+
+        node = self._map.get(key)
+        if node is not None:
+            self._bytes += size - node.size
+            node.value = value
+            node.size = size
+            self._touched(node)
+        else:
+            node = CacheNode(key, value, size)
+            self._map.put(key, node)
+            self._bytes += size
+            self._added(node)
+
+        # Evict others until the cache is within its bounds; the entry just put is kept
+        while self._over_bounds():
+            self._evict(self._victim(node))
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its value from the cache, if it is cached. Runs in O(1).
+        """
+        node = self._map.get(key)
+        if node is not None:
+            self._drop(node)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache. The counters are kept.
+        """
+        self._map.clear()
+        self._bytes = 0
+        self._reset_order()
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache along with its size and bounds. The hit rate
+        is the share of gets that found their key (None before the first get).
+        """
+        lookups = self._hits + self._misses
+        return {
+            'entries': self.get_size(),
+            'bytes': self._bytes,
+            'max_entries': self._max_entries,
+            'max_bytes': self._max_bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'hit_rate': self._hits / lookups if lookups else None,
+        }
+
+    def reset_stats(self) -> None:
+        """Sets the hit, miss and eviction counters back to zero."""
+        self._hits = self._misses = self._evictions = 0
+
+    def _over_bounds(self) -> bool:
+        """Return whether the cache holds more entries or bytes than it may."""
+        return ((self._max_entries is not None and self._map.get_size() > self._max_entries) or
+                (self._max_bytes is not None and self._bytes > self._max_bytes))
+
+    def _evict(self, node: CacheNode) -> None:
+        """Remove an entry to make room, counting the eviction."""
+        self._drop(node)
+        self._evictions += 1
+
+    def _drop(self, node: CacheNode) -> None:
+        """Remove an entry from the map and from the eviction order."""
+        self._map.remove(node.key)
+        self._bytes -= node.size
+        self._removed(node)
+
+    def keys(self):
+        """
+        Returns a generator over the cached keys, from the next to be evicted to the last.
+        Does not mark them as used.
+        """
+        return (node.key for node in self._order())
+
+    # Eviction order, kept by the subclasses
+
+    @abstractmethod
+    def _added(self, node: CacheNode) -> None:
+        """Enter a node just put into the cache into the eviction order."""
+
+    @abstractmethod
+    def _touched(self, node: CacheNode) -> None:
+        """Record a use of a cached node (a get, or a put of its key)."""
+
+    @abstractmethod
+    def _removed(self, node: CacheNode) -> None:
+        """Take a node leaving the cache out of the eviction order."""
+
+    @abstractmethod
+    def _victim(self, keep: CacheNode) -> CacheNode:
+        """Return the next node to evict, other than keep."""
+
+    @abstractmethod
+    def _reset_order(self) -> None:
+        """Empty the eviction order."""
+
+    @abstractmethod
+    def _order(self):
+        """Yield the cached nodes from the next to be evicted to the last."""
+
+
+class LRUCache(Cache):
+    """
+    Cache that evicts the least recently used entry. Entries are kept in one recency
+    list, least recently used first; a get or put moves its entry to the end.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._reset_order()
+
+    def _reset_order(self) -> None:
+        # Sentinel of the circular recency list
+        self._head = CacheNode()
+
+    def _added(self, node: CacheNode) -> None:
+        _link_before(node, self._head)
+
+    def _touched(self, node: CacheNode) -> None:
+        _unlink(node)
+        _link_before(node, self._head)
+
+    def _removed(self, node: CacheNode) -> None:
+        _unlink(node)
+
+    def _victim(self, keep: CacheNode) -> CacheNode:
+        # keep was just used, so it is last and only first when it is alone
+        return self._head.next
+
+    def _order(self):
+        node = self._head.next
+        while node is not self._head:
+            # Read the successor first, so the caller may remove the node
+            successor = node.next
+            yield node
+            node = successor
+
+
+class FrequencyBucket:
+    """The entries of an LFUCache used the same number of times, least recently used first."""
+    __slots__ = ('count', 'head', 'prev', 'next')
+
+    def __init__(self, count: int = 0) -> None:
+        self.count = count
+        # Sentinel of the bucket's circular recency list
+        self.head = CacheNode()
+        # Neighbouring buckets, in increasing order of count
+        self.prev = self
+        self.next = self
+
+    def is_empty(self) -> bool:
+        return self.head.next is self.head
+
+
+class LFUCache(Cache):
+    """
+    Cache that evicts the least frequently used entry, and of those the least recently
+    used. Entries are kept in frequency buckets ordered by use count; a get or put moves
+    its entry to the bucket one count higher, creating it if needed, so no step ever
+    searches for a bucket.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._reset_order()
+
+    def _reset_order(self) -> None:
+        # Sentinel of the circular list of buckets
+        self._buckets = FrequencyBucket()
+
+    def _bucket_after(self, bucket: FrequencyBucket, count: int) -> FrequencyBucket:
+        """Return the bucket for count, which must follow bucket, creating it if needed."""
+        successor = bucket.next
+        if successor is not self._buckets and successor.count == count:
+            return successor
+
+        new = FrequencyBucket(count)
+        new.prev = bucket
+        new.next = successor
+        bucket.next = new
+        successor.prev = new
+        return new
+
+    def _leave(self, node: CacheNode) -> None:
+        """Take node out of its bucket, dropping the bucket if that empties it."""
+        bucket = node.bucket
+        _unlink(node)
+        node.bucket = None
+        if bucket.is_empty():
+            bucket.prev.next = bucket.next
+            bucket.next.prev = bucket.prev
+
+    def _added(self, node: CacheNode) -> None:
+        node.bucket = self._bucket_after(self._buckets, 1)
+        _link_before(node, node.bucket.head)
+
+    def _touched(self, node: CacheNode) -> None:
+        # Find the next bucket before leaving, as leaving may drop the current one
+        bucket = self._bucket_after(node.bucket, node.bucket.count + 1)
+        self._leave(node)
+        node.bucket = bucket
+        _link_before(node, bucket.head)
+
+    def _removed(self, node: CacheNode) -> None:
+        self._leave(node)
+
+    def _victim(self, keep: CacheNode) -> CacheNode:
+        victim = self._buckets.next.head.next
+        if victim is keep:
+            # keep was just used, so it is last in its bucket: the only one there
+            victim = keep.bucket.next.head.next
+        return victim
+
+    def _order(self):
+        bucket = self._buckets.next
+        while bucket is not self._buckets:
+            successor = bucket.next
+            node = bucket.head.next
+            while node is not bucket.head:
+                next_node = node.next
+                yield node
+                node = next_node
+            bucket = successor
+
+    def frequency(self, key: str) -> int:
+        """
+        Returns the number of times the given key was put or got since it was cached,
+        or 0 if it is not cached. Runs in O(1).
+        """
+        node = self._map.get(key)
+        return node.bucket.count if node is not None else 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU cache of 3 entries")
+    print("----------------------")
+    c = LRUCache(3)
+    for key in 'abc':
+        c.put(key, key.upper())
+    c.get('a')
+    c.put('d', 'D')
+    print(list(c.keys()), c.get('b'), c.get('a'))
+    print(c.stats())
+
+    print("\nLFU cache of 3 entries")
+    print("----------------------")
+    c = LFUCache(3, function=hash_function_2)
+    for key in 'abc':
+        c.put(key, key.upper())
+    c.get('a')
+    c.get('a')
+    c.get('b')
+    c.put('d', 'D')
+    print(list(c.keys()), c.frequency('a'), c.contains_key('c'))
+    print(c.stats())
+
+    print("\nLRU cache bounded by bytes")
+    print("--------------------------")
+    c = LRUCache(max_bytes=1000, sizeof=lambda key, value: len(value))
+    for i in range(10):
+        c.put('k' + str(i), bytes(300))
+    print(c.get_size(), c.get_bytes(), list(c.keys()), c.stats()['evictions'])
@@ -0,0 +1,353 @@
+# Name: Dominic Fantauzzo
+# OSU Email: fantauzd@oregonstate.edu
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Due Date: March 14, 2024,
+# Description: Thread-safe separate chaining hash map using lock striping. Bucket i is
+#              guarded by lock i % stripes, so get, put and remove on buckets of
+#              different stripes never wait for each other. Resizing and whole-map
+#              operations take every stripe, always in the same order, so they cannot
+#              deadlock with each other. Pairs put with a ttl expire as in hash_map_sc;
+#              expire() sweeps one stripe at a time.
+
+import threading
+import time
+from contextlib import contextmanager
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_sc import HashMap, TREEIFY_THRESHOLD, _find, _nodes
+
+# Default number of locks; bucket i is guarded by lock i % stripes
+STRIPES = 16
+
+
+class ConcurrentHashMap(HashMap):
+    """
+    Separate chaining hash map that may be shared between threads. Keyed operations lock
+    only the stripe of the key's bucket; everything else locks the whole map.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = STRIPES,
+                 capacity_mode: str = 'prime',
+                 treeify_threshold: int = TREEIFY_THRESHOLD) -> None:
+        """
+        Initialize new ConcurrentHashMap with the given number of lock stripes.
+        The other arguments are as for hash_map_sc.HashMap; resizes are
+        always done at once, never incrementally.
+        """
+        if stripes < 1:
+            raise ValueError('stripes must be at least 1')
+
+        # The locks, and the change in size made under each one. A key's stripe moves
+        # when the table is resized, so one count may go negative; only the sum matters
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._counts = [0] * stripes
+
+        # The thread holding every stripe, if any. The whole-map operations inherited from
+        # hash_map_sc call expire() themselves, and that thread must not take a stripe again
+        self._holder = None
+
+        super().__init__(capacity, function, capacity_mode, 0, treeify_threshold)
+
+        # The stripe expire() sweeps first, so a sweep cut short by its budget resumes there
+        self._expire_stripe = 0
+
+    @property
+    def _size(self) -> int:
+        """Number of pairs in the map, summed over the stripes."""
+        return sum(self._counts)
+
+    @_size.setter
+    def _size(self, size: int) -> None:
+        # Only assigned while every stripe is held (or before the map is shared)
+        self._counts = [size] + [0] * (len(self._locks) - 1)
+
+    @contextmanager
+    def _all_stripes(self):
+        """Hold every stripe lock, acquired in index order so two holders cannot deadlock."""
+        for lock in self._locks:
+            lock.acquire()
+        self._holder = threading.get_ident()
+        try:
+            yield
+        finally:
+            self._holder = None
+            for lock in reversed(self._locks):
+                lock.release()
+
+    def _lock_bucket(self, hash: int) -> tuple:
+        """
+        Acquires the lock of the bucket the given hash maps to and returns (stripe, index).
+        The capacity can only change while every stripe is held, so once the lock is
+        held it is checked again; if a resize got in first the bucket is looked up anew.
+        """
+        locks = self._locks
+        while True:
+            capacity = self._capacity
+            index = hash % capacity
+            stripe = index % len(locks)
+            locks[stripe].acquire()
+            if self._capacity == capacity:
+                return stripe, index
+            locks[stripe].release()
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Doubles a table of the given capacity if it is still current and still too full;
+        another thread may have resized it since the caller looked. As in hash_map_sc,
+        growing is put off if sweeping out expired pairs makes enough room.
+        """
+        with self._all_stripes():
+            if self._capacity == capacity and self.table_load() >= 1:
+                if not (self._expiring and self._reclaim()):
+                    self._resize_table(self._grow_capacity(capacity))
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Updates the key/value pair in the hash map, or adds it if the key is not there.
+        With a ttl the pair expires that many seconds from now; without one it never
+        does (even if it had a ttl before). Only the key's stripe is locked; expired pairs
+        elsewhere are left for lookups, expire() and the sweep before the table grows.
+        Runs in amortized O(1).
+        """
+        expires = None
+        if ttl is not None:
+            expires = self._clock() + ttl
+            self._expiring = True
+
+        hash = self._hash(key)
+        stripe, index = self._lock_bucket(hash)
+        try:
+            capacity = self._capacity
+
+            # If the key is found, update the value
+            node = _find(self._buckets.get_at_index(index), key, hash)
+            if node is not None:
+                node.value = value
+                node.expires = expires
+                return
+
+            # If the key is not found, add it
+            self._insert(self._buckets, index, key, value, hash, expires)
+            self._counts[stripe] += 1
+        finally:
+            self._locks[stripe].release()
+
+        # Resize with no stripe held, since resizing takes them all
+        if self.table_load() >= 1:
+            self._grow(capacity)
+
+    def _find_in_stripe(self, key: str, hash: int, stripe: int, index: int):
+        """
+        Returns the node holding the given key in the bucket at the given index, or None if
+        it is not there. A pair whose time-to-live has run out counts as absent and is
+        unlinked on the spot. The bucket's stripe must be held.
+        """
+        node = _find(self._buckets.get_at_index(index), key, hash)
+        if node is not None and node.expires is not None and node.expires <= self._clock():
+            self._remove_from(self._buckets, index, key, hash)
+            self._counts[stripe] -= 1
+            return None
+        return node
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key, or None if the key is not in
+        the hash map or has expired. Only the key's stripe is locked. Runs in O(1).
+        """
+        hash = self._hash(key)
+        stripe, index = self._lock_bucket(hash)
+        try:
+            node = self._find_in_stripe(key, hash, stripe, index)
+        finally:
+            self._locks[stripe].release()
+
+        return node.value if node is not None else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map and has not expired, otherwise
+        False. Only the key's stripe is locked. Runs in O(1).
+        """
+        hash = self._hash(key)
+        stripe, index = self._lock_bucket(hash)
+        try:
+            return self._find_in_stripe(key, hash, stripe, index) is not None
+        finally:
+            self._locks[stripe].release()
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map, if it is there.
+        Only the key's stripe is locked. Runs in O(1).
+        """
+        hash = self._hash(key)
+        stripe, index = self._lock_bucket(hash)
+        try:
+            if self._remove_from(self._buckets, index, key, hash):
+                self._counts[stripe] -= 1
+        finally:
+            self._locks[stripe].release()
+
+    def expire(self, budget: float = None) -> int:
+        """
+        Sweeps the buckets of the current table for pairs whose time-to-live has run out,
+        unlinks them and returns how many it removed. The buckets of one stripe are swept
+        at a time, holding only that stripe's lock, so other threads keep working on the
+        rest of the map. With a budget (in seconds) the sweep stops after the stripe during
+        which it ran out, and the next sweep starts at the stripe after that.
+        Runs in O(N) where N is the capacity, or within the budget.
+        """
+        # Called by an inherited whole-map operation, which already holds every stripe
+        if self._holder == threading.get_ident():
+            return super().expire(budget)
+
+        if not self._expiring:
+            return 0
+
+        clock = time.perf_counter
+        deadline = clock() + budget if budget is not None else None
+        locks = self._locks
+        start = self._expire_stripe
+        removed = 0
+
+        for n in range(len(locks)):
+            stripe = (start + n) % len(locks)
+            with locks[stripe]:
+                # The table cannot be resized while a stripe is held
+                buckets, capacity = self._buckets, self._capacity
+                now = self._clock()
+                count = 0
+                for index in range(stripe, capacity, len(locks)):
+                    bucket = buckets.get_at_index(index)
+                    if bucket is not None:
+                        # Copy the nodes first, as unlinking changes the bucket
+                        for node in tuple(_nodes(bucket)):
+                            if node.expires is not None and node.expires <= now:
+                                self._remove_from(buckets, index, node.key, node.hash)
+                                count += 1
+                self._counts[stripe] -= count
+            removed += count
+            if deadline is not None and clock() >= deadline:
+                break
+
+        self._expire_stripe = (stripe + 1) % len(locks)
+        return removed
+
+    # The operations below act on the whole map, so they hold every stripe. Batches are
+    # therefore applied atomically with respect to the keyed operations of other threads.
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every (key, value) pair in the given iterable, atomically. The
+        table is grown to the capacity the batch needs first, with the stripes already
+        held, so the batch itself never has to resize (which would take them again).
+        """
+        pairs = list(pairs)
+        with self._all_stripes():
+            new_capacity = self._capacity
+            while self._size + len(pairs) > new_capacity:
+                new_capacity = self._grow_capacity(new_capacity)
+            if new_capacity != self._capacity:
+                self._resize_table(new_capacity)
+            super().put_many(pairs)
+
+    def get_many(self, keys) -> DynamicArray:
+        """Returns a dynamic array of the values of the given keys, read atomically."""
+        keys = list(keys)
+        with self._all_stripes():
+            return super().get_many(keys)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """Returns a dynamic array telling which of the given keys are present, atomically."""
+        keys = list(keys)
+        with self._all_stripes():
+            return super().contains_many(keys)
+
+    def remove_many(self, keys) -> None:
+        """Removes each of the given keys from the hash map, atomically."""
+        keys = list(keys)
+        with self._all_stripes():
+            super().remove_many(keys)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """Changes the capacity of the underlying table while holding every stripe."""
+        with self._all_stripes():
+            self._resize_table(new_capacity)
+
+    def _resize_table(self, new_capacity: int) -> None:
+        """Changes the capacity of the underlying table; every stripe must already be held."""
+        super().resize_table(new_capacity)
+
+    def harder_resize_table(self, new_capacity: int) -> None:
+        """Changes the capacity of the underlying table while holding every stripe."""
+        with self._all_stripes():
+            super().harder_resize_table(new_capacity)
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty buckets, counted while holding every stripe."""
+        with self._all_stripes():
+            return super().empty_buckets()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array of the key/value pairs, copied while holding every stripe."""
+        with self._all_stripes():
+            return super().get_keys_and_values()
+
+    def save(self, path: str) -> None:
+        """Writes the map to a binary snapshot file at path while holding every stripe."""
+        with self._all_stripes():
+            super().save(path)
+
+    def clear(self) -> None:
+        """Clears the contents of the hash map while holding every stripe. Runs in O(stripes)."""
+        with self._all_stripes():
+            super().clear()
+
+    def _iter_nodes(self):
+        """
+        Yields the node of every pair in the hash map. Each bucket's nodes are copied
+        under its stripe lock, so other threads keep working during the iteration, which
+        sees each bucket as it was when reached (pairs added or removed elsewhere in the
+        meantime may or may not be seen). Pairs expired when the iteration starts are
+        skipped. Raises RuntimeError if the table is resized while the iteration is in
+        progress.
+        """
+        buckets, capacity, locks = self._buckets, self._capacity, self._locks
+        now = self._clock() if self._expiring else None
+
+        for i in range(capacity):
+            lock = locks[i % len(locks)]
+            with lock:
+                if self._buckets is not buckets:
+                    raise RuntimeError('hash map resized during iteration')
+                nodes = tuple(node for node in _nodes(buckets.get_at_index(i))
+                              if now is None or node.expires is None or node.expires > now)
+            yield from nodes
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nthreaded put, get and remove")
+    print("----------------------------")
+    m = ConcurrentHashMap(11, hash_function_2, stripes=8)
+
+    def worker(n: int) -> None:
+        for i in range(2000):
+            m.put('t' + str(n) + '-' + str(i), i)
+        for i in range(0, 2000, 2):
+            m.remove('t' + str(n) + '-' + str(i))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    print(m.get('t3-1'), m.get('t3-2'), m.contains_key('t7-1999'))
+    print(sum(1 for _ in m.keys()) == m.get_keys_and_values().length() == m.get_size())
@@ -3,29 +3,157 @@
 # Course: CS261 - Data Structures
 # Assignment: Assignment 6: HashMap Implementation
 # Due Date: March 14, 2024,
-# Description: Implementation of a hash map using open addressing and quadratic probing to resolve collisions.
+# Description: Implementation of a hash map using open addressing and quadratic probing (or another
+#              selectable probing strategy) to resolve collisions.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
+import time
+
+from a6_include import (BucketArray, DynamicArray, HashEntry, EXPIRE_CHECK, EXPIRE_STEP, GROWTH_PRIME_SET,
+                        STATS_SAMPLE, hash_keys, instrument, length_summary, mix_hash,
+                        next_growth_prime, sample_indices, uninstrument,
                         hash_function_1, hash_function_2)
+from hash_map_shared import SharedHashMap, build_shared
+from snapshot import SnapshotMap, load as load_snapshot, write_snapshot
+
+
+# ----------------------- PROBING STRATEGIES ------------------------------- #
+#
+# A probing strategy is a generator function taking (hash, key, capacity) that yields
+# the bucket indices to try for a key, starting with its home bucket. Strategies that
+# only cover the whole table when the capacity is a power of two say so with a
+# power_of_two attribute, and the map then sizes its table accordingly.
+
+def linear_probe(hash: int, key: str, capacity: int):
+    """Probe the home bucket and then each following bucket in turn."""
+    bucket_index = hash % capacity
+    while True:
+        yield bucket_index
+        bucket_index += 1
+        if bucket_index == capacity:
+            bucket_index = 0
+
+
+def quadratic_probe(hash: int, key: str, capacity: int):
+    """
+    Probe hash + i ** 2 for i = 0, 1, 2, ... Only about half the buckets of a prime
+    table are reachable, which is enough while the load factor stays at or below 0.5.
+    """
+    i = 0
+    while True:
+        yield (hash + i * i) % capacity
+        i += 1
+
+
+def double_hash_probe(hash: int, key: str, capacity: int):
+    """
+    Probe the home bucket and then step through the table by a key-dependent stride
+    taken from hash_function_2. The stride is only computed if the home bucket is taken.
+    Every bucket is reachable because the stride is coprime with the capacity: any
+    stride is for a prime capacity, and an odd one is for a power of two.
+    """
+    bucket_index = hash % capacity
+    yield bucket_index
+
+    step = 1 + hash_function_2(key) % (capacity - 1)
+    if capacity & (capacity - 1) == 0:
+        step |= 1
+    while True:
+        bucket_index = (bucket_index + step) % capacity
+        yield bucket_index
+
+
+def triangular_probe(hash: int, key: str, capacity: int):
+    """
+    Probe hash + i * (i + 1) / 2 for i = 0, 1, 2, ... Over a power of two capacity
+    this visits every bucket exactly once before repeating.
+    """
+    mask = capacity - 1
+    bucket_index = hash & mask
+    i = 0
+    while True:
+        yield bucket_index
+        i += 1
+        bucket_index = (bucket_index + i) & mask
+
+
+triangular_probe.power_of_two = True
+
+# Probing strategies selectable by name
+PROBES = {
+    'linear': linear_probe,
+    'quadratic': quadratic_probe,
+    'double': double_hash_probe,
+    'triangular': triangular_probe,
+}
+
+# Left in the old table's slots during an incremental resize once their entry has moved.
+# It is a tombstone, so probe sequences in the old table still run past it.
+MOVED = HashEntry(None, None)
+MOVED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, tombstone_limit: float = 0.25,
+                 probing='quadratic', capacity_mode: str = 'prime', rehash_step: int = 0) -> None:
         """
-        Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Initialize new HashMap that uses open addressing
+        (quadratic probing by default) for collision resolution.
+        Tombstones are cleared by an in-place rehash once they
+        outnumber tombstone_limit * capacity.
+        probing is a name from PROBES or a probing strategy function.
+        capacity_mode 'prime' keeps prime capacities; 'pow2' (implied by
+        power_of_two strategies) uses power of two capacities and mixes
+        every hash so its low bits spread well.
+        A positive rehash_step makes growth incremental: each later
+        operation moves that many old buckets to the new table, or the
+        few more needed to finish before the table must grow again.
         """
-        self._buckets = DynamicArray()
+        self._probe = PROBES[probing] if isinstance(probing, str) else probing
+        self._power_of_two = capacity_mode == 'pow2' or getattr(self._probe, 'power_of_two', False)
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # Quadratic probing reaches too few buckets of a power of two table to be safe
+        if self._power_of_two and self._probe is quadratic_probe:
+            raise ValueError("quadratic probing requires capacity_mode='prime'")
+
+        # capacity must be a prime number (or a power of two in pow2 mode)
+        self._capacity = self._next_capacity(capacity)
+        self._buckets = BucketArray(self._capacity)
 
         self._hash_function = function
         self._size = 0
 
+        # The full hash stored for each key; mixed in pow2 mode, where only the low bits pick the bucket
+        self._hash = (lambda key: mix_hash(function(key))) if self._power_of_two else function
+
+        # While an incremental resize is in progress the previous table is kept here, and
+        # its buckets from _rehash_index onwards may still hold entries not yet moved over
+        self._rehash_step = rehash_step
+        self._migrate_step = rehash_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # Removed entries stay behind as tombstones until a rehash clears them
+        self._tombstones = 0
+        self._tombstone_limit = tombstone_limit
+
+        # Number of resizes and of in-place tombstone purges so far, reported by stats()
+        self._resizes = 0
+        self._purges = 0
+
+        # Bumped by every change to which entries are stored or where, so iterations notice them.
+        # Reclaiming expired entries is not one, as iterations already skip them
+        self._version = 0
+
+        # Profiling hooks; the operations are only instrumented while there are any
+        self._hooks = []
+
+        # Entries put with a time-to-live carry the clock time they expire at. Once there are
+        # any, every put also sweeps a few buckets for expired entries, resuming at _expire_index
+        self._clock = time.monotonic
+        self._expiring = False
+        self._expire_index = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -49,6 +177,27 @@ class HashMap:
 
         return capacity
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        Return the smallest valid capacity at least as large as the given one: the next
+        power of two in pow2 mode, otherwise the next prime (found without a search
+        when it is one of the precomputed GROWTH_PRIMES).
+        """
+        if self._power_of_two:
+            return 1 << max(capacity - 1, 1).bit_length()
+        if capacity in GROWTH_PRIME_SET:
+            return capacity
+        return self._next_prime(capacity)
+
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity a table of the given capacity grows to: double it in pow2
+        mode, otherwise the next of the precomputed GROWTH_PRIMES at least double it.
+        """
+        if self._power_of_two:
+            return capacity * 2
+        return next_growth_prime(capacity * 2) or self._next_prime(capacity * 2)
+
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
@@ -85,43 +234,119 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
-    def put(self, key: str, value: object) -> None:
+    def put(self, key: str, value: object, ttl: float = None) -> None:
         """
         Updates the key/value pair in the hash map. If the given key already exists in
         the hash map, its associated value is replaced with the new value. If the given key is
-        not in the hash map, a new key/value pair is added. This runs in amortized O(1) time as the number of buckets
+        not in the hash map, a new key/value pair is added. With a ttl the pair expires that
+        many seconds from now; without one it never does (even if it had a ttl before).
+        This runs in amortized O(1) time as the number of buckets
         to search is limited to a constant and resize doubles capacity.
         """
 
-        # If load is too high then resize to double current capacity
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
-
-        # find the bucket that the key is first hashed to
-        bucket_index = self._hash_function(key) % self._capacity
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
+
+        expires = None
+        if ttl is not None:
+            expires = self._clock() + ttl
+            self._expiring = True
+        if self._expiring:
+            self._expire_some(EXPIRE_STEP)
+
+            # Expired entries take up room until they are reclaimed, so reclaim them before growing
+            if (self._size + self._tombstones) / self._capacity >= 0.5:
+                self._reclaim()
+
+        # Tombstones lengthen probe sequences; once there are too many, clear them in place
+        if self._tombstones > self._tombstone_limit * self._capacity:
+            self._purge_tombstones()
+
+        # If load (counting tombstones, which probes must walk past) is too high
+        # then resize to (at least) double current capacity
+        if (self._size + self._tombstones) / self._capacity >= 0.5:
+            if self._rehash_step > 0:
+                self._start_rehash(self._grow_capacity(self._capacity))
+            else:
+                self.resize_table(self._grow_capacity(self._capacity))
+
+        # Hash the key once; every probe reuses it and the entry caches it for resizes
+        hash = self._hash(key)
+
+        # A key still waiting in the old table of an incremental resize is updated there
+        if self._old_buckets is not None:
+            entry = self._find_in(self._old_buckets, self._old_capacity, key, hash)
+            if entry is not None:
+                entry.value = value
+                entry.expires = expires
+                return
 
-        # If the bucket is not empty, continue with quadratic probing until we find an empty bucket or the key.
-        # We already probed the original bucket, so we start quadratic probing with a base of 1
-        i = 1
-        while self._buckets.get_at_index(bucket_index) is not None:
+        self._put_hashed(key, value, hash, expires)
 
-            # If the same key is found, then we update the value
-            if self._buckets.get_at_index(bucket_index).key == key:
-                self._buckets.get_at_index(bucket_index).value = value
-                #If the key is in a tombstone, it is no longer a tombstone and size increases
-                if self._buckets.get_at_index(bucket_index).is_tombstone:
-                    self._buckets.get_at_index(bucket_index).is_tombstone = False
-                    self._size += 1
+    def _put_hashed(self, key: str, value: object, hash: int, expires: float = None) -> None:
+        """
+        Adds or updates a pair whose key hash is already known, without any load check.
+        Probes until we find an empty bucket or the key, and reuses the first tombstone
+        on the way if the key turns out to be new.
+        """
+        tombstone = None
+        for bucket_index in self._probe(hash, key, self._capacity):
+            entry = self._buckets.get_at_index(bucket_index)
+            if entry is None:
+                break
+
+            # Remember the first tombstone we pass, a new key can take it over
+            if entry.is_tombstone:
+                if tombstone is None:
+                    tombstone = entry
+
+            # If the same key is found, then we update the value (cached hashes reject most mismatches cheaply)
+            elif entry.hash == hash and entry.key == key:
+                entry.value = value
+                entry.expires = expires
                 return
 
-            # Use quadratic probing to find the next index
-            bucket_index = (self._hash_function(key) + i ** 2) % self._capacity
-            i += 1
-
-        # Once we probe to an empty index, we insert the value
-        self._buckets.set_at_index(bucket_index, HashEntry(key, value))
+        # The key is not in the table, so reuse the first tombstone on its path or else the empty bucket
+        if tombstone is not None:
+            tombstone.key, tombstone.value, tombstone.hash = key, value, hash
+            tombstone.expires = expires
+            tombstone.is_tombstone = False
+            self._tombstones -= 1
+        else:
+            self._buckets.set_at_index(bucket_index, HashEntry(key, value, hash, expires))
         self._size = self._size + 1
+        self._version += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every (key, value) pair in the given iterable, in order, exactly as
+        calling put on each pair would. All keys are hashed in one batch and the table is
+        resized at most once, up front, to the capacity the batch needs. Runs in amortized
+        O(k) where k is the number of pairs.
+        """
+        keys, values = [], []
+        for key, value in pairs:
+            keys.append(key)
+            values.append(value)
+        if not keys:
+            return
+
+        # Bulk loads resize synchronously, so complete any incremental resize first
+        self._finish_rehash()
 
+        # Grow once to the capacity that putting the pairs one at a time would reach.
+        # Resizing also clears tombstones, so rehash in place if they alone would overload the table
+        new_capacity = self._capacity
+        while (self._size + len(keys) - 1) * 2 >= new_capacity:
+            new_capacity = self._grow_capacity(new_capacity)
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+        elif self._tombstones > self._tombstone_limit * self._capacity or \
+                (self._size + self._tombstones + len(keys) - 1) * 2 >= self._capacity:
+            self._purge_tombstones()
+
+        for key, value, hash in zip(keys, values, hash_keys(self._hash_function, keys, self._power_of_two)):
+            self._put_hashed(key, value, hash)
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -134,21 +359,103 @@ class HashMap:
         if new_capacity < self._size:
             return
 
-        # Create a new hash table, this handles ensuring capacity is prime
-        new_map = HashMap(new_capacity, self._hash_function)
+        # Every entry must be in the current table before it is replaced
+        self._finish_rehash()
 
         # Correct the bug in the _next_prime method for 2 that we are not allowed to change
-        if new_capacity == 2:
-            new_map._capacity = 2
-            new_map._buckets.pop()
+        if new_capacity != 2:
+            new_capacity = self._next_capacity(new_capacity)
 
-        # Hash all the hash entries that are not tombstones into the new hash map
-        for bucket in self:
-            new_map.put(bucket.key, bucket.value)
+        # Putting every entry into the new table would double it whenever the load reaches 0.5,
+        # so settle on that final capacity up front and rehash only once
+        while self._size and (self._size - 1) * 2 >= new_capacity:
+            new_capacity = self._grow_capacity(new_capacity)
+
+        new_buckets = BucketArray(new_capacity)
+
+        # Move all the hash entries that are not tombstones into the new table.
+        # The cached hash is reused, so keys are never hashed again on resize
+        for entry in self._entries():
+            self._place(new_buckets, new_capacity, entry)
+
+        # Update buckets and capacity; tombstones were left behind
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._resizes += 1
+        self._version += 1
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize: installs an empty table of the given capacity and
+        keeps the current one aside until its entries have been moved over.
+        """
+        # Finish any resize still in progress, so at most two tables exist
+        self._finish_rehash()
+
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._rehash_index = 0
+
+        # Each put adds at most one entry or tombstone, and the table grows again once they
+        # fill half of it, so every old bucket must be moved within that many operations
+        headroom = max(1, (new_capacity + 1) // 2 - self._size - 1)
+        self._migrate_step = max(self._rehash_step, -(-self._old_capacity // headroom))
+        self._resizes += 1
+        self._version += 1
+
+        self._buckets = BucketArray(new_capacity)
+        self._capacity = new_capacity
+
+        # The old table's tombstones stay behind with it
+        self._tombstones = 0
+
+    def _rehash_some(self, count: int) -> None:
+        """
+        Moves the live entries of up to count buckets of the old table into the current one,
+        dropping the old table once every bucket has been visited. Cached hashes are reused.
+        """
+        old_buckets = self._old_buckets
+        stop = min(self._rehash_index + count, self._old_capacity)
+
+        for i in range(self._rehash_index, stop):
+            entry = old_buckets.get_at_index(i)
+            if entry is not None and not entry.is_tombstone:
+                self._place(self._buckets, self._capacity, entry)
+                old_buckets.set_at_index(i, MOVED)
+
+        self._rehash_index = stop
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._rehash_index = 0
+
+    def _finish_rehash(self) -> None:
+        """Completes an incremental resize in progress, if any."""
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_capacity)
+
+    def _place(self, buckets: DynamicArray, capacity: int, entry: HashEntry) -> None:
+        """Stores an entry in the first empty bucket of its probe sequence in the given table."""
+        for bucket_index in self._probe(entry.hash, entry.key, capacity):
+            if buckets.get_at_index(bucket_index) is None:
+                buckets.set_at_index(bucket_index, entry)
+                return
+
+    def _purge_tombstones(self) -> None:
+        """
+        Clears all tombstones by rehashing the live entries within the current bucket
+        array, without allocating a new table. Occurs in O(N) where N is the capacity.
+        """
+        entries = list(self._entries())
+
+        self._buckets.clear()
 
-        # Update buckets and capacity
-        self._buckets = new_map._buckets
-        self._capacity = new_map._capacity
+        for entry in entries:
+            self._place(self._buckets, self._capacity, entry)
+
+        self._tombstones = 0
+        self._purges += 1
+        self._version += 1
 
     def table_load(self) -> float:
         """
@@ -164,11 +471,96 @@ class HashMap:
 
         # Iterate over each bucket and count buckets that are empty
         full_buckets = 0
-        for bucket in self: # Only iterates over buckets that have values (not tombstones)
+        for bucket in self._entries(): # Only iterates over buckets that have values (not tombstones)
                 full_buckets += 1
 
         return self._capacity - full_buckets
 
+    def stats(self, sample: int = STATS_SAMPLE) -> dict:
+        """
+        Returns statistics for spotting a poorly spreading hash function or tombstone
+        build-up: histograms, maxima and means of successful and unsuccessful probe
+        lengths (buckets examined), along with the load, tombstone count and number of
+        resizes and purges so far. Only sample randomly chosen buckets are examined, so
+        this runs in O(sample) probe sequences rather than O(N); pass sample=None for
+        an exact scan. During an incremental resize only the current table is examined.
+        """
+        buckets, capacity = self._buckets, self._capacity
+        indices = sample_indices(capacity, sample)
+
+        # A successful search for a live entry in a sampled bucket probes until it reaches that bucket
+        successful = []
+        for i in indices:
+            entry = buckets.get_at_index(i)
+            if entry is not None and not entry.is_tombstone:
+                for length, bucket_index in enumerate(self._probe(entry.hash, entry.key, capacity), 1):
+                    if bucket_index == i:
+                        successful.append(length)
+                        break
+
+        # An unsuccessful search for a key whose home is a sampled bucket probes until an empty
+        # bucket (or, for sequences that cycle, until it has made capacity probes)
+        unsuccessful = []
+        for i in indices:
+            length = 0
+            for _, bucket_index in zip(range(capacity), self._probe(i, str(i), capacity)):
+                length += 1
+                if buckets.get_at_index(bucket_index) is None:
+                    break
+            unsuccessful.append(length)
+
+        return {
+            'size': self._size,
+            'capacity': capacity,
+            'load': self.table_load(),
+            'tombstones': self._tombstones,
+            'resizes': self._resizes,
+            'purges': self._purges,
+            'rehashing': self._old_buckets is not None,
+            'successful_probes': length_summary(successful),
+            'unsuccessful_probes': length_summary(unsuccessful),
+        }
+
+    def add_hook(self, callback) -> None:
+        """
+        Registers a profiling hook: callback is called with an OperationEvent after every
+        put, get, contains_key, remove, resize_table and clear. The operations are only
+        instrumented while at least one hook is registered.
+        """
+        if not self._hooks:
+            instrument(self, self._hooks)
+        self._hooks.append(callback)
+
+    def remove_hook(self, callback) -> None:
+        """
+        Unregisters a profiling hook. Once none are left the operations run uninstrumented.
+        """
+        self._hooks.remove(callback)
+        if not self._hooks:
+            uninstrument(self)
+
+    def _probe_length(self, key: str) -> int:
+        """
+        Returns the number of buckets a lookup of the given key examines: up to and
+        including its entry, or up to the first empty bucket when the key is missing (in
+        both tables during an incremental resize). Used by profiling hooks.
+        """
+        hash = self._hash(key)
+        tables = [(self._buckets, self._capacity)]
+        if self._old_buckets is not None:
+            tables.append((self._old_buckets, self._old_capacity))
+
+        probes = 0
+        for buckets, capacity in tables:
+            for _, bucket_index in zip(range(capacity), self._probe(hash, key, capacity)):
+                probes += 1
+                entry = buckets.get_at_index(bucket_index)
+                if entry is None:
+                    break
+                if entry.hash == hash and entry.key == key and not entry.is_tombstone:
+                    return probes
+        return probes
+
     def get(self, key: str) -> object:
         """
         Returns the value associated with the given key. If the key is not in the hash
@@ -176,22 +568,13 @@ class HashMap:
         because load factor is limited to 0.5.
         """
 
-        # find the bucket that the key is first hashed to
-        bucket_index = self._hash_function(key) % self._capacity
-
-        # If the bucket is not empty, continue with quadratic probing until we find an empty bucket or the key.
-        # We already probed the original bucket, so we start quadratic probing with a base of 1
-        i = 1
-        while self._buckets.get_at_index(bucket_index) is not None:
-
-            # If the same key is found, then we return the value
-            if self._buckets.get_at_index(bucket_index).key == key and \
-            self._buckets.get_at_index(bucket_index).is_tombstone == False:     # Ignore tombstones
-                return self._buckets.get_at_index(bucket_index).value
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
 
-            # Use quadratic probing to find the next index
-            bucket_index = (self._hash_function(key) + i ** 2) % self._capacity
-            i += 1
+        # Hash the key once and probe for its live entry
+        entry = self._find_live(key, self._hash(key))
+        if entry is not None:
+            return entry.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -200,25 +583,11 @@ class HashMap:
         because load factor is limited to 0.5.
         """
 
-        # find the bucket that the key is first hashed to
-        bucket_index = self._hash_function(key) % self._capacity
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
 
-        # If the bucket is not empty, continue with quadratic probing until we find an empty bucket or the key.
-        # We already probed the original bucket, so we start quadratic probing with a base of 1
-        i = 1
-        while self._buckets.get_at_index(bucket_index) is not None:
-
-            # If the same key is found, then we return True
-            if self._buckets.get_at_index(bucket_index).key == key and \
-            self._buckets.get_at_index(bucket_index).is_tombstone == False:         # Ignore tombstones
-                return True
-
-            # Use quadratic probing to find the next index
-            bucket_index = (self._hash_function(key) + i ** 2) % self._capacity
-            i += 1
-
-        # If we reached an empty bucket then the key is not in the hash table
-        return False
+        # Hash the key once and probe for its live entry; reaching an empty bucket means it is absent
+        return self._find_live(key, self._hash(key)) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -228,25 +597,183 @@ class HashMap:
         because load factor is limited to 0.5.
         """
 
-        # find the bucket that the key is first hashed to
-        bucket_index = self._hash_function(key) % self._capacity
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
 
-        # If the bucket is not empty, continue with quadratic probing until we find an empty bucket or the key.
-        # We already probed the original bucket, so we start quadratic probing with a base of 1.
-        i = 1
-        while self._buckets.get_at_index(bucket_index) is not None:
+        if self._remove_hashed(key, self._hash(key)):
+            self._version += 1
 
-            # If the same key is found, then make it a tombstone
-            if self._buckets.get_at_index(bucket_index).key == key:
-                if not self._buckets.get_at_index(bucket_index).is_tombstone: # If already tombstone, do nothing
-                    self._buckets.get_at_index(bucket_index).is_tombstone = True
-                    self._size -= 1
-                return
+    def _remove_hashed(self, key: str, hash: int) -> bool:
+        """
+        Turns the live entry holding the key with the given hash into a tombstone, in
+        whichever table holds it, and returns whether there was one. Only the current
+        table's tombstones are counted.
+        """
+        # Probe for the live entry holding the key (tombstones are skipped)
+        entry = self._find_in(self._buckets, self._capacity, key, hash)
+
+        # If the same key is found, then make it a tombstone
+        if entry is not None:
+            entry.is_tombstone = True
+            self._size -= 1
+            self._tombstones += 1
+            return True
+
+        if self._old_buckets is not None:
+            entry = self._find_in(self._old_buckets, self._old_capacity, key, hash)
+            if entry is not None:
+                entry.is_tombstone = True
+                self._size -= 1
+                return True
+        return False
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the hash map). Keys are hashed in one batch.
+        Runs in O(k) where k is the number of keys.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._power_of_two)):
+            if self._old_buckets is not None:
+                self._rehash_some(self._migrate_step)
+            entry = self._find_live(key, hash)
+            values.append(entry.value if entry is not None else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the hash map and False otherwise. Keys are hashed in one batch.
+        Runs in O(k) where k is the number of keys.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._power_of_two)):
+            if self._old_buckets is not None:
+                self._rehash_some(self._migrate_step)
+            found.append(self._find_live(key, hash) is not None)
+
+        return found
 
-            # Use quadratic probing to find the next index
-            bucket_index = (self._hash_function(key) + i ** 2) % self._capacity
-            i += 1
+    def remove_many(self, keys) -> None:
+        """
+        Removes each of the given keys and its associated value from the hash map. Keys
+        that are not in the hash map are ignored. Keys are hashed in one batch.
+        Runs in O(k) where k is the number of keys.
+        """
+        keys = list(keys)
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._power_of_two)):
+            if self._old_buckets is not None:
+                self._rehash_some(self._migrate_step)
+            if self._remove_hashed(key, hash):
+                self._version += 1
+
+    def _find_entry(self, key: str, hash: int) -> HashEntry:
+        """
+        Returns the live (non-tombstone) entry holding the given key, probing from its
+        already computed hash, or None if the key is not in the hash map. During an
+        incremental resize the old table is searched too.
+        """
+        entry = self._find_in(self._buckets, self._capacity, key, hash)
+        if entry is None and self._old_buckets is not None:
+            entry = self._find_in(self._old_buckets, self._old_capacity, key, hash)
+        return entry
 
+    def _find_live(self, key: str, hash: int) -> HashEntry:
+        """
+        Returns the live entry holding the given key like _find_entry, except that an
+        entry whose time-to-live has run out counts as absent and becomes a tombstone.
+        Expired entries are already invisible, so reclaiming one is not a change that
+        iterations need to notice.
+        """
+        entry = self._find_entry(key, hash)
+        if entry is not None and entry.expires is not None and entry.expires <= self._clock():
+            self._remove_hashed(key, hash)
+            return None
+        return entry
+
+    def _expire_some(self, count: int) -> int:
+        """
+        Turns the expired entries among the next count buckets of the current table into
+        tombstones, going round from where the last sweep stopped, and returns how many.
+        """
+        buckets, capacity = self._buckets, self._capacity
+        now = self._clock()
+        index = self._expire_index % capacity
+        removed = 0
+
+        for _ in range(min(count, capacity)):
+            entry = buckets.get_at_index(index)
+            if entry is not None and entry.expires is not None and entry.expires <= now \
+                    and not entry.is_tombstone:
+                entry.is_tombstone = True
+                removed += 1
+            index = index + 1 if index + 1 < capacity else 0
+
+        self._expire_index = index
+        self._size -= removed
+        self._tombstones += removed
+        return removed
+
+    def expire(self, budget: float = None) -> int:
+        """
+        Sweeps the buckets of the current table for entries whose time-to-live has run
+        out, turns them into tombstones and returns how many it found. Each bucket is
+        visited at most once, starting where the last sweep stopped; with a budget (in
+        seconds) the sweep stops early once it has run that long, so it can be called
+        periodically (e.g. from a timer on the thread that owns the map) without
+        stalling other work. Runs in O(N) where N is the capacity, or within the budget.
+        """
+        if not self._expiring:
+            return 0
+
+        clock = time.perf_counter
+        deadline = clock() + budget if budget is not None else None
+        removed = 0
+        for start in range(0, self._capacity, EXPIRE_CHECK):
+            removed += self._expire_some(min(EXPIRE_CHECK, self._capacity - start))
+            if deadline is not None and clock() >= deadline:
+                break
+        return removed
+
+    def _reclaim(self) -> None:
+        """
+        Sweeps the whole table for expired entries before it grows. If that brought the
+        load down to 3/4 of its limit or less, their tombstones are cleared in place so
+        growing can be put off. Needing that much room keeps full sweeps to one per
+        eighth of the capacity in puts, so amortized O(1).
+        """
+        self.expire()
+        if self._size / self._capacity <= 0.375:
+            self._purge_tombstones()
+
+    def _find_in(self, buckets: DynamicArray, capacity: int, key: str, hash: int) -> HashEntry:
+        """
+        Returns the live entry holding the given key in the given table, or None. At most
+        capacity buckets are probed: an old table being drained by an incremental resize is
+        at its load limit and never regains empty buckets, so a quadratic probe sequence
+        could otherwise cycle through occupied buckets forever.
+        """
+        for _, bucket_index in zip(range(capacity), self._probe(hash, key, capacity)):
+            entry = buckets.get_at_index(bucket_index)
+            if entry is None:
+                return None
+            if entry.hash == hash and entry.key == key and not entry.is_tombstone:
+                return entry
+
+    def _entries(self):
+        """
+        Yields every entry of the current table that is not a tombstone, expired or not,
+        so after an expire() they number exactly _size. O(N) where N is the capacity.
+        """
+        buckets = self._buckets
+        for i in range(self._capacity):
+            entry = buckets.get_at_index(i)
+            if entry is not None and not entry.is_tombstone:
+                yield entry
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -264,48 +791,115 @@ class HashMap:
         return tuple_arr
 
 
-    def clear(self) -> None:
+    def save(self, path: str) -> None:
         """
-        Clears the contents of the hash map. It does not change the underlying hash table capacity.
-        Runs in O(N) time where N is the number of elements (size).
+        Writes the map to a binary snapshot file at path: its live entries grouped by
+        home bucket, with their cached hashes, plus the hash function if it is one
+        snapshot.py can name. Tombstones are left out, so the file does not depend on
+        the probing strategy. Open it again with load. Keys must be str; values are
+        pickled. Runs in O(N) where N is the capacity.
         """
+        self._finish_rehash()
+        self.expire()
 
-        # Iterate over each bucket and set it to None
-        for i in range(self._capacity):
-            self._buckets.set_at_index(i, None)
+        triples = ((entry.key, entry.value, entry.hash) for entry in self._entries())
+        write_snapshot(path, triples, self._size, self._capacity, self._hash_function, self._power_of_two)
 
-        self._size = 0
+    @staticmethod
+    def load(path: str, mmap: bool = True, function=None) -> SnapshotMap:
+        """
+        Opens a snapshot written by save as a read-only SnapshotMap that serves get and
+        contains_key straight from the file, memory-mapped unless mmap is False.
+        function must be given if the snapshot does not name its hash function.
+        """
+        return load_snapshot(path, mmap, function)
 
-    def __iter__(self):
+    def share(self, name: str = None) -> SharedHashMap:
         """
-        Enables the hash map to iterate across itself.
+        Copies the map into a new shared memory segment, named name or a random name, as
+        a read-only SharedHashMap that other processes attach to by name (see attach) and
+        read without copying it. Keys must be str; values are pickled. The segment lives
+        until the returned map's unlink is called. Runs in O(N) where N is the capacity.
         """
+        # The shared table always probes by the mixed hash, which pow2 mode has cached already
+        mix = (lambda hash: hash) if self._power_of_two else mix_hash
+        self._finish_rehash()
+        self.expire()
 
-        # Initialize a variable to track iterators' progress
-        self._index = 0
+        triples = ((entry.key, entry.value, mix(entry.hash)) for entry in self._entries())
+        return build_shared(triples, self._size, self._hash_function, name)
 
-        return self
+    @staticmethod
+    def attach(name: str, function=None) -> SharedHashMap:
+        """
+        Attaches to a shared memory segment made by share, in this or any other process,
+        as a read-only SharedHashMap serving get and contains_key from the shared pages.
+        function must be given if the table does not name its hash function.
+        """
+        return SharedHashMap(name, function)
 
-    def __next__(self):
+    def clear(self) -> None:
         """
-        Returns the next item in the hash map, based on the current location of the iterator.
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        Runs in O(1) time.
         """
 
-        # Find the next item in the buckets dynamic array that is not None or a tombstone
-        try:
-            while self._buckets.get_at_index(self._index) is None or \
-            self._buckets.get_at_index(self._index).is_tombstone == True:
-                self._index = self._index + 1
+        # Any incremental resize in progress is abandoned along with the old table
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # Empty every bucket at once; stale buckets are overwritten as they are reused
+        self._buckets.clear()
+        self._version += 1
 
-            value = self._buckets.get_at_index(self._index)
+        self._size = 0
+        self._tombstones = 0
+        self._expiring = False
+        self._expire_index = 0
 
-        # If we pass the end of the array an exception is raised and we stop iteration
-        except DynamicArrayException:
-            raise StopIteration
+    def __iter__(self):
+        """
+        Enables the hash map to iterate across itself, yielding each live entry lazily.
+        Every iteration keeps its own position, so any number can run at once, nested or
+        interleaved. Completes any incremental resize first, so every entry is in one
+        table. Entries expired when the iteration starts are skipped but left for writes
+        and expire() to reclaim. Raises RuntimeError if entries are added or removed, or
+        the table is rebuilt, while the iteration is in progress.
+        """
+        self._finish_rehash()
+        version, buckets = self._version, self._buckets
+        now = self._clock() if self._expiring else None
 
-        # Increment index and return value
-        self._index = self._index + 1
-        return value
+        for i in range(self._capacity):
+            entry = buckets.get_at_index(i)
+            if entry is not None and not entry.is_tombstone:
+                if now is not None and entry.expires is not None and entry.expires <= now:
+                    continue
+                yield entry
+                if self._version != version:
+                    raise RuntimeError('hash map changed during iteration')
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map (see __iter__).
+        Each step runs in amortized O(1), a full pass in O(N) where N is the capacity.
+        """
+        return (entry.key for entry in self)
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map (see __iter__).
+        Each step runs in amortized O(1), a full pass in O(N) where N is the capacity.
+        """
+        return (entry.value for entry in self)
+
+    def items(self):
+        """
+        Returns a generator over the (key, value) pairs of the hash map (see __iter__).
+        Each step runs in amortized O(1), a full pass in O(N) where N is the capacity.
+        """
+        return ((entry.key, entry.value) for entry in self)
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -0,0 +1,394 @@
+# Name: Dominic Fantauzzo
+# OSU Email: fantauzd@oregonstate.edu
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Due Date: March 14, 2024,
+# Description: Open addressing hash map using Robin Hood hashing. Entries are placed by
+#              linear probing, but an entry that has probed further from its home bucket
+#              takes the slot of one that has probed less. Removal shifts the following
+#              entries back instead of leaving tombstones, so probe lengths stay short
+#              and even at load factors well above 0.5.
+
+from a6_include import (DynamicArray, HashEntry, hash_keys, mix_hash,
+                        hash_function_1, hash_function_2)
+
+# Probe distance stored for a slot that holds no entry
+EMPTY = -1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, max_load: float = 0.85) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood hashing with
+        linear probing for collision resolution. The table doubles
+        whenever an insert would push the load factor above max_load,
+        which must be below 1. Key hashes are passed through mix_hash
+        before they pick a home bucket.
+        """
+        # A full table would leave no empty slot to end the probe for an absent key
+        if not 0 < max_load < 1:
+            raise ValueError('max_load must be between 0 and 1 (exclusive)')
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._max_load = max_load
+
+        # The full hash stored for each key. It is always mixed: linear probing turns any
+        # run of nearby home buckets, which weak functions give similar keys, into one long
+        # cluster, and every key in it pays the walk to its slot
+        self._hash = lambda key: mix_hash(function(key))
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Create empty slot arrays for the given capacity. Each slot keeps its key, value,
+        cached hash and distance from its home bucket (EMPTY when unused).
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = [None] * capacity
+        self._dists = [EMPTY] * capacity
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._dists[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) +
+                        ' D: ' + str(self._dists[i]) + '\n')
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the given key already exists in
+        the hash map, its associated value is replaced with the new value. If the given key is
+        not in the hash map, a new key/value pair is added. Runs in amortized O(1) time.
+        """
+
+        # If the insert could push the load past max_load then resize to double current capacity
+        if self._size + 1 > self._max_load * self._capacity:
+            self.resize_table(self._capacity * 2)
+
+        self._put_hashed(key, value, self._hash(key))
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """Adds or updates a pair whose mixed key hash is already known, without any load check."""
+        keys, values, hashes, dists = self._keys, self._values, self._hashes, self._dists
+        capacity = self._capacity
+        index = hash % capacity
+        dist = 0
+
+        # Walk the probe sequence while the residents are at least as far from home as we are.
+        # Past that point the Robin Hood invariant guarantees the key is not in the table.
+        while dists[index] >= dist:
+            if hashes[index] == hash and keys[index] == key:
+                values[index] = value
+                return
+            index += 1
+            if index == capacity:
+                index = 0
+            dist += 1
+
+        self._size += 1
+
+        # Take the slot; whoever lived there (if anyone) is closer to home, so it moves on
+        while dists[index] != EMPTY:
+            if dists[index] < dist:
+                keys[index], key = key, keys[index]
+                values[index], value = value, values[index]
+                hashes[index], hash = hash, hashes[index]
+                dists[index], dist = dist, dists[index]
+            index += 1
+            if index == capacity:
+                index = 0
+            dist += 1
+
+        keys[index] = key
+        values[index] = value
+        hashes[index] = hash
+        dists[index] = dist
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every (key, value) pair in the given iterable, in order, exactly as
+        calling put on each pair would. All keys are hashed in one batch and the table is
+        resized at most once, up front. Runs in amortized O(k) where k is the number of pairs.
+        """
+        keys, values = [], []
+        for key, value in pairs:
+            keys.append(key)
+            values.append(value)
+        if not keys:
+            return
+
+        # Grow once to a capacity that holds the whole batch within max_load
+        new_capacity = self._capacity
+        while self._size + len(keys) > self._max_load * new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+
+        for key, value, hash in zip(keys, values, hash_keys(self._hash_function, keys, True)):
+            self._put_hashed(key, value, hash)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the underlying table, rehashing all entries from their
+        cached hashes. The capacity is raised as needed to keep the load within max_load.
+        Occurs in O(N) where N is the capacity.
+        """
+        if new_capacity < self._size:
+            return
+
+        # _next_prime skips 2 even though it is prime
+        if new_capacity != 2:
+            new_capacity = self._next_prime(new_capacity)
+
+        while self._size > self._max_load * new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        keys, values, hashes, dists = self._keys, self._values, self._hashes, self._dists
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._size = 0
+
+        for i in range(len(dists)):
+            if dists[i] != EMPTY:
+                self._put_hashed(keys[i], values[i], hashes[i])
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor. O(1)
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table. O(1)
+        """
+        return self._capacity - self._size
+
+    def _find_index(self, key: str, hash: int) -> int:
+        """
+        Returns the slot index holding the given key, probing from its already computed
+        mixed hash, or -1 if the key is not in the hash map. A miss stops as soon as it reaches
+        an entry closer to its home than the key would be.
+        """
+        keys, hashes, dists = self._keys, self._hashes, self._dists
+        capacity = self._capacity
+        index = hash % capacity
+        dist = 0
+
+        while dists[index] >= dist:
+            if hashes[index] == hash and keys[index] == key:
+                return index
+            index += 1
+            if index == capacity:
+                index = 0
+            dist += 1
+
+        return -1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None. Occurs in O(1) time.
+        """
+        index = self._find_index(key, self._hash(key))
+        return self._values[index] if index >= 0 else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        Occurs in O(1) time.
+        """
+        return self._find_index(key, self._hash(key)) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing. Occurs in O(1) time.
+        """
+        self._remove_index(self._find_index(key, self._hash(key)))
+
+    def _remove_index(self, index: int) -> None:
+        """
+        Empties the slot at the given index (if any) by backward-shift deletion: each
+        following entry that is away from its home bucket moves back one slot.
+        """
+        if index < 0:
+            return
+
+        keys, values, hashes, dists = self._keys, self._values, self._hashes, self._dists
+        capacity = self._capacity
+
+        next_index = index + 1 if index + 1 < capacity else 0
+        while dists[next_index] > 0:
+            keys[index] = keys[next_index]
+            values[index] = values[next_index]
+            hashes[index] = hashes[next_index]
+            dists[index] = dists[next_index] - 1
+            index = next_index
+            next_index = index + 1 if index + 1 < capacity else 0
+
+        keys[index] = None
+        values[index] = None
+        hashes[index] = None
+        dists[index] = EMPTY
+        self._size -= 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the hash map). Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, True)):
+            index = self._find_index(key, hash)
+            values.append(self._values[index] if index >= 0 else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the hash map and False otherwise. Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, True)):
+            found.append(self._find_index(key, hash) >= 0)
+
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each of the given keys and its associated value from the hash map. Keys
+        that are not in the hash map are ignored. Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, True)):
+            self._remove_index(self._find_index(key, hash))
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map. Runs in O(N) time where N is the capacity.
+        """
+        tuple_arr = DynamicArray()
+        dists = self._dists
+        for i in range(self._capacity):
+            if dists[i] != EMPTY:
+                tuple_arr.append((self._keys[i], self._values[i]))
+
+        return tuple_arr
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def __iter__(self):
+        """
+        Iterates over the entries of the hash map. Each one is handed out as a
+        HashEntry built on the fly, since the table itself stores no entry objects.
+        """
+        dists = self._dists
+        for i in range(self._capacity):
+            if dists[i] != EMPTY:
+                yield HashEntry(self._keys[i], self._values[i], self._hashes[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
@@ -5,29 +5,106 @@
 # Due Date: March 14, 2024,
 # Description: Implementation of a hash map using chaining to resolve collisions.
 
+import time
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+from a6_include import (BucketArray, DynamicArray, LinkedList, SLNode, SortedBucket, EXPIRE_CHECK, EXPIRE_STEP,
+                        GROWTH_PRIME_SET, STATS_SAMPLE, hash_keys,
+                        instrument, length_summary, mix_hash, next_growth_prime, sample_indices,
+                        uninstrument, hash_function_1, hash_function_2)
+from snapshot import SnapshotMap, load as load_snapshot, write_snapshot
+
+# A bucket whose chain grows past this many nodes is converted to a SortedBucket
+TREEIFY_THRESHOLD = 16
+
+
+# Buckets are allocated lazily. An empty bucket is None, a bucket holding one pair is that
+# pair's SLNode stored inline, and only a collision promotes it to a LinkedList (which a
+# long chain in turn swaps for a SortedBucket).
+
+def _nodes(bucket):
+    """Return an iterable over the nodes held in a bucket, whichever form it takes."""
+    if bucket is None:
+        return ()
+    if type(bucket) is SLNode:
+        return (bucket,)
+    return bucket
+
+
+def _length(bucket) -> int:
+    """Return the number of nodes held in a bucket, whichever form it takes."""
+    if bucket is None:
+        return 0
+    if type(bucket) is SLNode:
+        return 1
+    return bucket.length()
+
+
+def _find(bucket, key: str, hash: int) -> SLNode:
+    """Return the node in a bucket holding the key with the given hash, or None."""
+    if type(bucket) is SLNode:
+        return bucket if bucket.hash == hash and bucket.key == key else None
+    if bucket is None:
+        return None
+    return bucket.contains(key, hash)
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 capacity_mode: str = 'prime',
+                 rehash_step: int = 0,
+                 treeify_threshold: int = TREEIFY_THRESHOLD) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        Buckets are allocated lazily: None while empty, the node
+        itself while holding one pair, and a chain after a collision.
+        capacity_mode 'prime' keeps prime capacities; 'pow2' uses power
+        of two capacities and mixes every hash so its low bits spread well.
+        A positive rehash_step makes growth incremental: each later
+        operation moves that many old buckets to the new table, or the
+        few more needed to finish before the table must grow again.
+        A chain longer than treeify_threshold is converted to a
+        SortedBucket searched in O(log n), and back to a linked list once
+        it shrinks to half that; 0 keeps every bucket a linked list.
         """
-        self._buckets = DynamicArray()
+        self._power_of_two = capacity_mode == 'pow2'
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # capacity must be a prime number (or a power of two in pow2 mode)
+        self._capacity = self._next_capacity(capacity)
+        self._buckets = BucketArray(self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._treeify_threshold = treeify_threshold
+
+        # The full hash stored for each key; mixed in pow2 mode, where only the low bits pick the bucket
+        self._hash = (lambda key: mix_hash(function(key))) if self._power_of_two else function
+
+        # While an incremental resize is in progress the previous table is kept here, and
+        # its buckets from _rehash_index onwards still hold entries not yet moved over
+        self._rehash_step = rehash_step
+        self._migrate_step = rehash_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # Number of times the table has been rebuilt at a new capacity, reported by stats()
+        self._resizes = 0
+
+        # Bumped by every change to which pairs are stored or where, so iterations notice them.
+        # Reclaiming expired pairs is not one, as iterations already skip them
+        self._version = 0
+
+        # Profiling hooks; the operations are only instrumented while there are any
+        self._hooks = []
+
+        # Pairs put with a time-to-live carry the clock time they expire at. Once there are
+        # any, every put also sweeps a few buckets for expired pairs, resuming at _expire_index
+        self._clock = time.monotonic
+        self._expiring = False
+        self._expire_index = 0
 
     def __str__(self) -> str:
         """
@@ -52,6 +129,27 @@ class HashMap:
 
         return capacity
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        Return the smallest valid capacity at least as large as the given one: the next
+        power of two in pow2 mode, otherwise the next prime (found without a search
+        when it is one of the precomputed GROWTH_PRIMES).
+        """
+        if self._power_of_two:
+            return 1 << max(capacity - 1, 1).bit_length()
+        if capacity in GROWTH_PRIME_SET:
+            return capacity
+        return self._next_prime(capacity)
+
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity a table of the given capacity grows to: double it in pow2
+        mode, otherwise the next of the precomputed GROWTH_PRIMES at least double it.
+        """
+        if self._power_of_two:
+            return capacity * 2
+        return next_growth_prime(capacity * 2) or self._next_prime(capacity * 2)
+
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
@@ -88,31 +186,265 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
-    def put(self, key: str, value: object) -> None:
+    def put(self, key: str, value: object, ttl: float = None) -> None:
         """
         Updates the key/value pair in the hash map. If the given key already exists in
         the hash map, its associated value is replaced with the new value. If the given key is
-        not in the hash map, a new key/value pair is added. Runs in amortized O(1) as the number of elements
+        not in the hash map, a new key/value pair is added. With a ttl the pair expires that
+        many seconds from now; without one it never does (even if it had a ttl before).
+        Runs in amortized O(1) as the number of elements
         in each bucket is limited to a constant and resizing doubles capacity.
         """
 
-        # If load is too high then resize to double current capacity
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
-
-        # find the bucket that the key is hashed to
-        hash_bucket = self._buckets.get_at_index(self._hash_function(key) % self._capacity)
-
-        # Search each node in the bucket
-        for node in hash_bucket:
-            # If the key is found, update the value
-            if node.key == key:
-                node.value = value
-                return
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
+
+        expires = None
+        if ttl is not None:
+            expires = self._clock() + ttl
+            self._expiring = True
+        if self._expiring:
+            self._expire_some(EXPIRE_STEP)
+
+        # If load is too high then resize to (at least) double current capacity,
+        # unless reclaiming expired pairs makes enough room
+        if self.table_load() >= 1 and not (self._expiring and self._reclaim()):
+            if self._rehash_step > 0:
+                self._start_rehash(self._grow_capacity(self._capacity))
+            else:
+                self.resize_table(self._grow_capacity(self._capacity))
+
+        # Hash the key once; the full hash is cached in the node for lookups and resizes
+        hash = self._hash(key)
+
+        # If the key is found, update the value
+        node = self._find_node(key, hash)
+        if node is not None:
+            node.value = value
+            node.expires = expires
+            return
 
         # If the key is not found, add it
-        hash_bucket.insert(key, value)
+        self._insert(self._buckets, hash % self._capacity, key, value, hash, expires)
         self._size += 1
+        self._version += 1
+
+    def _insert(self, buckets: DynamicArray, index: int, key: str, value: object, hash: int,
+                expires: float = None) -> None:
+        """
+        Adds a pair whose key is not in the bucket at the given index of the given table.
+        An empty bucket stores the pair's node inline; a collision promotes the bucket to
+        a LinkedList, which becomes a SortedBucket once it is longer than the treeify
+        threshold.
+        """
+        bucket = buckets.get_at_index(index)
+        if bucket is None:
+            buckets.set_at_index(index, SLNode(key, value, None, hash, expires))
+            return
+
+        if type(bucket) is SLNode:
+            chain = LinkedList()
+            chain.insert(bucket.key, bucket.value, bucket.hash, bucket.expires)
+            buckets.set_at_index(index, chain)
+            bucket = chain
+
+        bucket.insert(key, value, hash, expires)
+        if bucket.length() > self._treeify_threshold > 0 and type(bucket) is LinkedList:
+            buckets.set_at_index(index, SortedBucket(bucket))
+
+    def _remove_from(self, buckets: DynamicArray, index: int, key: str, hash: int) -> bool:
+        """
+        Removes the key with the given hash from the bucket at the given index of the given
+        table and returns whether it was there. A chain left holding one node goes back to
+        storing it inline, and a sorted bucket that shrinks to half the treeify threshold
+        is turned back into a linked list.
+        """
+        bucket = buckets.get_at_index(index)
+        if type(bucket) is SLNode:
+            if bucket.hash == hash and bucket.key == key:
+                buckets.set_at_index(index, None)
+                return True
+            return False
+
+        if bucket is None or not bucket.remove(key, hash):
+            return False
+
+        # The last node of a chain links to nothing, so it can be stored inline as it is
+        length = bucket.length()
+        if length == 1:
+            buckets.set_at_index(index, next(iter(bucket)))
+        elif type(bucket) is SortedBucket and length <= self._treeify_threshold // 2:
+            chain = LinkedList()
+            for node in bucket:
+                chain.insert(node.key, node.value, node.hash, node.expires)
+            buckets.set_at_index(index, chain)
+        return True
+
+    def _find_node(self, key: str, hash: int):
+        """
+        Returns the node holding the given key, or None if the key is not in the hash map.
+        During an incremental resize, buckets of the old table not yet moved are searched too.
+        """
+        node = _find(self._buckets.get_at_index(hash % self._capacity), key, hash)
+        if node is None and self._old_buckets is not None:
+            old_index = hash % self._old_capacity
+            if old_index >= self._rehash_index:
+                node = _find(self._old_buckets.get_at_index(old_index), key, hash)
+        return node
+
+    def _find_live(self, key: str, hash: int):
+        """
+        Returns the node holding the given key like _find_node, except that a pair whose
+        time-to-live has run out counts as absent and is unlinked on the spot. Expired
+        pairs are already invisible, so unlinking one is not a change that iterations
+        need to notice.
+        """
+        node = self._find_node(key, hash)
+        if node is not None and node.expires is not None and node.expires <= self._clock():
+            self._remove_hashed(key, hash)
+            return None
+        return node
+
+    def _expire_some(self, count: int) -> int:
+        """
+        Unlinks the expired pairs from the next count buckets of the current table, going
+        round from where the last sweep stopped, and returns how many it removed.
+        """
+        buckets, capacity = self._buckets, self._capacity
+        now = self._clock()
+        index = self._expire_index % capacity
+        removed = 0
+
+        for _ in range(min(count, capacity)):
+            bucket = buckets.get_at_index(index)
+            if bucket is not None:
+                # Copy the nodes first, as unlinking changes the bucket
+                for node in tuple(_nodes(bucket)):
+                    if node.expires is not None and node.expires <= now:
+                        self._remove_from(buckets, index, node.key, node.hash)
+                        removed += 1
+            index = index + 1 if index + 1 < capacity else 0
+
+        self._expire_index = index
+        self._size -= removed
+        return removed
+
+    def expire(self, budget: float = None) -> int:
+        """
+        Sweeps the buckets of the current table for pairs whose time-to-live has run out,
+        unlinks them and returns how many it removed. Each bucket is visited at most once,
+        starting where the last sweep stopped; with a budget (in seconds) the sweep stops
+        early once it has run that long, so it can be called periodically (e.g. from a
+        timer on the thread that owns the map) without stalling other work.
+        Runs in O(N) where N is the capacity, or within the budget.
+        """
+        if not self._expiring:
+            return 0
+
+        clock = time.perf_counter
+        deadline = clock() + budget if budget is not None else None
+        removed = 0
+        for start in range(0, self._capacity, EXPIRE_CHECK):
+            removed += self._expire_some(min(EXPIRE_CHECK, self._capacity - start))
+            if deadline is not None and clock() >= deadline:
+                break
+        return removed
+
+    def _reclaim(self) -> bool:
+        """
+        Sweeps the whole table for expired pairs before it grows, and returns True if that
+        brought the load down to 3/4 or less, so growing can be put off. Needing that much
+        room keeps full sweeps to one per quarter of the capacity in puts, so amortized O(1).
+        """
+        self.expire()
+        return self.table_load() <= 0.75
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize: installs an empty table of the given capacity and
+        keeps the current one aside until its buckets have been moved over.
+        """
+        # Finish any resize still in progress, so at most two tables exist
+        self._finish_rehash()
+
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._rehash_index = 0
+
+        # Each put adds at most one pair, and the table grows again once there are as many
+        # pairs as buckets, so every old bucket must be moved within that many operations
+        headroom = max(1, new_capacity - self._size - 1)
+        self._migrate_step = max(self._rehash_step, -(-self._old_capacity // headroom))
+        self._resizes += 1
+        self._version += 1
+
+        self._buckets = BucketArray(new_capacity)
+        self._capacity = new_capacity
+
+    def _rehash_some(self, count: int) -> None:
+        """
+        Moves up to count buckets of the old table into the current one, dropping the old
+        table once every bucket has been moved. Cached hashes are reused. Each moved bucket
+        is emptied, so the old nodes are freed a few at a time rather than all at once
+        with the old table.
+        """
+        old_buckets, buckets, capacity = self._old_buckets, self._buckets, self._capacity
+        stop = min(self._rehash_index + count, self._old_capacity)
+
+        for i in range(self._rehash_index, stop):
+            bucket = old_buckets.get_at_index(i)
+            if bucket is not None:
+                for node in _nodes(bucket):
+                    self._insert(buckets, node.hash % capacity, node.key, node.value, node.hash, node.expires)
+                old_buckets.set_at_index(i, None)
+
+        self._rehash_index = stop
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._rehash_index = 0
+
+    def _finish_rehash(self) -> None:
+        """Completes an incremental resize in progress, if any."""
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_capacity)
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every (key, value) pair in the given iterable, in order, exactly as
+        calling put on each pair would. All keys are hashed in one batch and the table is
+        resized at most once, up front, to the capacity the batch needs. Runs in O(n + k)
+        where n is the number of elements and k the number of pairs.
+        """
+        keys, values = [], []
+        for key, value in pairs:
+            keys.append(key)
+            values.append(value)
+        if not keys:
+            return
+
+        # Bulk loads resize synchronously, so complete any incremental resize first
+        self._finish_rehash()
+
+        # Grow once to the capacity that putting the pairs one at a time would reach
+        new_capacity = self._capacity
+        while self._size + len(keys) > new_capacity:
+            new_capacity = self._grow_capacity(new_capacity)
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+
+        buckets, capacity = self._buckets, self._capacity
+        for key, value, hash in zip(keys, values, hash_keys(self._hash_function, keys, self._power_of_two)):
+            index = hash % capacity
+
+            # If the key is found, update the value, otherwise add it
+            node = _find(buckets.get_at_index(index), key, hash)
+            if node is not None:
+                node.value = value
+                node.expires = None
+            else:
+                self._insert(buckets, index, key, value, hash)
+                self._size += 1
+                self._version += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -125,25 +457,38 @@ class HashMap:
         if new_capacity < 1:
             return
 
-        # Create a new hash table, this handles ensuring capacity is prime
-        new_map = HashMap(new_capacity, self._hash_function)
+        # Every entry must be in the current table before it is replaced
+        self._finish_rehash()
 
         # Correct the bug in the _next_prime method for 2 that we are not allowed to change
-        if new_capacity == 2:
-            new_map._capacity = 2
-            new_map._buckets.pop()
+        if new_capacity != 2:
+            new_capacity = self._next_capacity(new_capacity)
+
+        # Putting every pair into the new table would grow it whenever the load reaches 1,
+        # so settle on that final capacity up front and rehash only once
+        while self._size > new_capacity:
+            new_capacity = self._grow_capacity(new_capacity)
+
+        # Initialize new buckets, all empty until a pair lands in them
+        new_buckets = BucketArray(new_capacity)
 
         # Copy each element from the old hash table to the new hash table
         list_pointer = 0
+        counter = 0
         # Copy all elements from each bucket until the new hash table is the same size as the old hash table
-        while new_map._size < self._size:
-            for node in self._buckets.get_at_index(list_pointer):
-                new_map.put(node.key, node.value)
+        while counter < self._size:
+            for node in _nodes(self._buckets.get_at_index(list_pointer)):
+                # The cached hash is reused, so keys are never hashed again on resize
+                self._insert(new_buckets, node.hash % new_capacity, node.key, node.value, node.hash,
+                             node.expires)
+                counter += 1
             list_pointer += 1
 
         # Update buckets and capacity
-        self._buckets = new_map._buckets
-        self._capacity = new_map._capacity
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._resizes += 1
+        self._version += 1
 
     def harder_resize_table(self, new_capacity: int) -> None:
         """
@@ -155,26 +500,27 @@ class HashMap:
         # Ensure that the new capacity is a prime number greater than or equal to 1
         if new_capacity < 1:
             return
+        self._finish_rehash()
         if new_capacity != 2:
-            new_capacity = self._next_prime(new_capacity)
-        # Initialize new buckets
-        new_buckets = DynamicArray()
-        for _ in range(new_capacity):
-            new_buckets.append(LinkedList())
+            new_capacity = self._next_capacity(new_capacity)
+        # Initialize new buckets, all empty until a pair lands in them
+        new_buckets = BucketArray(new_capacity)
         # Copy each element from the old hash table to the new hash table
         list_pointer = 0
         counter = 0
         # Copy all elements from each bucket until the new hash table is the same size as the old hash table
         while counter < self._size:
-            for node in self._buckets.get_at_index(list_pointer):
+            for node in _nodes(self._buckets.get_at_index(list_pointer)):
                 # find the bucket that the key is hashed to with the new capacity and insert it
-                hash_bucket = new_buckets.get_at_index(self._hash_function(node.key) % new_capacity)
-                hash_bucket.insert(node.key, node.value)
+                self._insert(new_buckets, node.hash % new_capacity, node.key, node.value, node.hash,
+                             node.expires)
                 counter += 1
             list_pointer += 1
         # Update buckets and capacity
         self._buckets = new_buckets
         self._capacity = new_capacity
+        self._resizes += 1
+        self._version += 1
 
     def table_load(self) -> float:
         """
@@ -188,14 +534,81 @@ class HashMap:
         is the capacity (number of buckets).
         """
 
+        self._finish_rehash()
+
         empty_buckets = 0
         # Checks the length of each bucket and iterates the counter when a bucket is empty
         for i in range(self._buckets.length()):
-            if self._buckets.get_at_index(i).length() == 0:
+            if _length(self._buckets.get_at_index(i)) == 0:
                 empty_buckets += 1
 
         return empty_buckets
 
+    def stats(self, sample: int = STATS_SAMPLE) -> dict:
+        """
+        Returns statistics for spotting a poorly spreading hash function: the histogram,
+        maximum and mean of the chain lengths, along with the load and the number of
+        resizes so far. Only sample randomly chosen buckets are examined, so this runs in
+        O(sample) rather than O(N); pass sample=None for an exact scan of every bucket.
+        During an incremental resize only the current table is examined.
+        """
+        buckets = self._buckets
+        chains = length_summary(_length(buckets.get_at_index(i))
+                                for i in sample_indices(self._capacity, sample))
+
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'resizes': self._resizes,
+            'rehashing': self._old_buckets is not None,
+            'chain_lengths': chains,
+        }
+
+    def add_hook(self, callback) -> None:
+        """
+        Registers a profiling hook: callback is called with an OperationEvent after every
+        put, get, contains_key, remove, resize_table and clear. The operations are only
+        instrumented while at least one hook is registered.
+        """
+        if not self._hooks:
+            instrument(self, self._hooks)
+        self._hooks.append(callback)
+
+    def remove_hook(self, callback) -> None:
+        """
+        Unregisters a profiling hook. Once none are left the operations run uninstrumented.
+        """
+        self._hooks.remove(callback)
+        if not self._hooks:
+            uninstrument(self)
+
+    def _probe_length(self, key: str) -> int:
+        """
+        Returns the number of nodes a lookup of the given key visits: up to and including
+        its node, or the whole chain when the key is missing (in both tables during an
+        incremental resize). Used by profiling hooks.
+        """
+        hash = self._hash(key)
+        chains = [self._buckets.get_at_index(hash % self._capacity)]
+        if self._old_buckets is not None and hash % self._old_capacity >= self._rehash_index:
+            chains.append(self._old_buckets.get_at_index(hash % self._old_capacity))
+
+        visited = 0
+        for chain in chains:
+            # A sorted bucket is binary searched rather than walked
+            if type(chain) is SortedBucket:
+                visited += chain.search_length()
+                if chain.contains(key, hash) is not None:
+                    return visited
+                continue
+
+            for node in _nodes(chain):
+                visited += 1
+                if node.hash == hash and node.key == key:
+                    return visited
+        return visited
+
     def get(self, key: str):
         """
         Returns the value associated with the given key. If the key is not in the hash
@@ -203,13 +616,13 @@ class HashMap:
         in each bucket is limited to a constant.
         """
 
-        # Find the bucket that the key is hashed to
-        hash_bucket = self._buckets.get_at_index(self._hash_function(key) % self._capacity)
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
 
-        # Iterate through bucket to find key
-        for node in hash_bucket:
-            if node.key == key:
-                return node.value
+        # Search the bucket the key is hashed to, skipping nodes whose cached hash differs
+        node = self._find_live(key, self._hash(key))
+        if node is not None:
+            return node.value
 
         # Return None if not found
         return None
@@ -221,16 +634,11 @@ class HashMap:
         in each bucket is limited to a constant.
         """
 
-        # Find the bucket that the key is hashed to
-        hash_bucket = self._buckets.get_at_index(self._hash_function(key) % self._capacity)
-
-        # Iterate through bucket to find key
-        for node in hash_bucket:
-            if node.key == key:
-                return True
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
 
-        # Return False if not found
-        return False
+        # Search the bucket the key is hashed to, skipping nodes whose cached hash differs
+        return self._find_live(key, self._hash(key)) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -239,15 +647,99 @@ class HashMap:
         Runs in O(1) as the number of elements in each bucket is limited to a constant.
         """
 
-        # Find the bucket that the key is hashed to
-        hash_bucket = self._buckets.get_at_index(self._hash_function(key) % self._capacity)
+        if self._old_buckets is not None:
+            self._rehash_some(self._migrate_step)
 
-        # Remove node if it is in the bucket
-        remove = hash_bucket.remove(key)
+        # Remove node if it is in the bucket the key is hashed to
+        if self._remove_hashed(key, self._hash(key)):
+            self._version += 1
+
+    def _remove_hashed(self, key: str, hash: int) -> bool:
+        """
+        Removes the key with the given hash from whichever table holds it and returns
+        whether it was there.
+        """
+        remove = self._remove_from(self._buckets, hash % self._capacity, key, hash)
+        if not remove and self._old_buckets is not None:
+            old_index = hash % self._old_capacity
+            if old_index >= self._rehash_index:
+                remove = self._remove_from(self._old_buckets, old_index, key, hash)
 
         # If the removal was successful, decrement size
         if remove is True:
             self._size -= 1
+        return remove
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the hash map). Keys are hashed in one batch.
+        Runs in O(k) where k is the number of keys.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._power_of_two)):
+            if self._old_buckets is not None:
+                self._rehash_some(self._migrate_step)
+            node = self._find_live(key, hash)
+            values.append(node.value if node is not None else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the hash map and False otherwise. Keys are hashed in one batch.
+        Runs in O(k) where k is the number of keys.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._power_of_two)):
+            if self._old_buckets is not None:
+                self._rehash_some(self._migrate_step)
+            found.append(self._find_live(key, hash) is not None)
+
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each of the given keys and its associated value from the hash map. Keys
+        that are not in the hash map are ignored. Keys are hashed in one batch.
+        Runs in O(k) where k is the number of keys.
+        """
+        keys = list(keys)
+
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._power_of_two)):
+            if self._old_buckets is not None:
+                self._rehash_some(self._migrate_step)
+            if self._remove_hashed(key, hash):
+                self._version += 1
+
+    def save(self, path: str) -> None:
+        """
+        Writes the map to a binary snapshot file at path: its entries grouped by bucket,
+        with their cached hashes, plus the hash function if it is one snapshot.py can
+        name. Open it again with load. Keys must be str; values are pickled.
+        Runs in O(N + capacity) where N is the number of elements.
+        """
+        self._finish_rehash()
+        self.expire()
+
+        buckets = self._buckets
+        triples = ((node.key, node.value, node.hash)
+                   for i in range(self._capacity) for node in _nodes(buckets.get_at_index(i)))
+        write_snapshot(path, triples, self._size, self._capacity, self._hash_function, self._power_of_two)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True, function=None) -> SnapshotMap:
+        """
+        Opens a snapshot written by save as a read-only SnapshotMap that serves get and
+        contains_key straight from the file, memory-mapped unless mmap is False.
+        function must be given if the snapshot does not name its hash function.
+        """
+        return load_snapshot(path, mmap, function)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -255,26 +747,76 @@ class HashMap:
         stored in the hash map. Runs in O(n) where n is the number of elements in the hash table.
         """
 
+        self._finish_rehash()
+        self.expire()
+
         tuple_arr = DynamicArray()
         list_pointer = 0
 
         # Copy all elements from each bucket as tuples until the tuple array is the same size as the old hash table
         while tuple_arr.length() < self._size:
-            for node in self._buckets.get_at_index(list_pointer):
+            for node in _nodes(self._buckets.get_at_index(list_pointer)):
                 tuple_arr.append((node.key, node.value))
             list_pointer += 1
 
         return tuple_arr
 
+    def _iter_nodes(self):
+        """
+        Yields the node of every pair in the hash map, lazily and independently of any
+        other iteration. Pairs expired when the iteration starts are skipped but left
+        for writes and expire() to unlink. Raises RuntimeError if pairs are added or
+        removed, or the table is rebuilt, while the iteration is in progress.
+        """
+        self._finish_rehash()
+        version, buckets = self._version, self._buckets
+        now = self._clock() if self._expiring else None
+
+        for i in range(self._capacity):
+            for node in _nodes(buckets.get_at_index(i)):
+                if now is not None and node.expires is not None and node.expires <= now:
+                    continue
+                yield node
+                if self._version != version:
+                    raise RuntimeError('hash map changed during iteration')
+
+    def keys(self):
+        """
+        Returns a generator over the keys of the hash map (see _iter_nodes).
+        Each step runs in amortized O(1), a full pass in O(N) where N is the capacity.
+        """
+        return (node.key for node in self._iter_nodes())
+
+    def values(self):
+        """
+        Returns a generator over the values of the hash map (see _iter_nodes).
+        Each step runs in amortized O(1), a full pass in O(N) where N is the capacity.
+        """
+        return (node.value for node in self._iter_nodes())
+
+    def items(self):
+        """
+        Returns a generator over the (key, value) pairs of the hash map (see _iter_nodes).
+        Each step runs in amortized O(1), a full pass in O(N) where N is the capacity.
+        """
+        return ((node.key, node.value) for node in self._iter_nodes())
+
     def clear(self) -> None:
         """
         Clears the contents of the hash map. It does not change the underlying hash
         table capacity. Runs in O(1).
         """
 
-        # set each bucket to an empty linked list
-        for i in range(self._capacity):
-            self._buckets.set_at_index(i, LinkedList())
+        # Any incremental resize in progress is abandoned along with the old table
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # empty every bucket at once; stale buckets are overwritten as they are reused
+        self._buckets.clear()
+        self._version += 1
+        self._expiring = False
+        self._expire_index = 0
 
         # set the size to 0
         self._size = 0
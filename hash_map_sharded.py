@@ -0,0 +1,340 @@
+# Name: Dominic Fantauzzo
+# OSU Email: fantauzd@oregonstate.edu
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Hash map sharded across worker processes, so it is not limited to the one
+#              core a single interpreter can use. Keys are partitioned by hash: each
+#              worker process owns one HashMap (separate chaining or open addressing)
+#              holding its shard of the keys, and the front-end in the calling process
+#              routes each operation to the shard of its key over a pipe. Batches are
+#              split by shard and sent to every shard before any reply is read, so the
+#              shards work on them in parallel and each pipe round trip is shared by
+#              many keys.
+
+import multiprocessing
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray, hash_keys, mix_hash, hash_function_1, hash_function_2
+
+# Name -> hash map class a shard can be built from
+MAP_TYPES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+}
+
+# Methods of the shards' maps the front-end may call
+SHARD_OPERATIONS = frozenset((
+    'put', 'get', 'contains_key', 'remove', 'put_many', 'get_many', 'contains_many',
+    'remove_many', 'get_size', 'get_capacity', 'clear', 'get_keys_and_values',
+))
+
+
+def _serve(conn, map_type: str, capacity: int, function) -> None:
+    """
+    Body of a worker process: build the shard's map, then answer each (sequence number,
+    operation, arguments) request from the front-end with (sequence number, 'ok', result)
+    or (sequence number, 'error', exception) until the pipe is closed or None is received.
+    """
+    m = MAP_TYPES[map_type](capacity, function)
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        sequence, name, args = request
+        try:
+            if name not in SHARD_OPERATIONS:
+                raise AttributeError('shards do not support ' + name)
+            result = getattr(m, name)(*args)
+            # Dynamic arrays go back as plain lists, which pickle more compactly
+            if isinstance(result, DynamicArray):
+                result = [result[i] for i in range(result.length())]
+            reply = (sequence, 'ok', result)
+        except Exception as error:
+            reply = (sequence, 'error', error)
+        conn.send(reply)
+
+    conn.close()
+
+
+class ShardedHashMap:
+    """
+    Hash map whose keys are spread over shards, each owned by its own worker process.
+    The front-end is not thread-safe: use it from one thread, or guard it with a lock.
+    Call close (or use the map as a context manager) to stop the workers.
+    """
+
+    def __init__(self,
+                 shards: int = None,
+                 map_type: str = 'sc',
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 start_method: str = None) -> None:
+        """
+        Start one worker process per shard (by default one per CPU), each owning a
+        map_type ('sc' or 'oa') HashMap of the given initial capacity and hash function.
+        start_method picks the multiprocessing start method; with 'spawn' or
+        'forkserver' the hash function must be picklable, so a module-level function.
+        """
+        if map_type not in MAP_TYPES:
+            raise ValueError('map_type must be one of ' + ', '.join(sorted(MAP_TYPES)))
+        shards = shards or multiprocessing.cpu_count()
+        if shards < 1:
+            raise ValueError('shards must be at least 1')
+
+        self._hash_function = function
+        # Number of the last request sent; each reply carries its request's number
+        self._sequence = 0
+        self._conns = []
+        self._processes = []
+
+        context = multiprocessing.get_context(start_method)
+        for _ in range(shards):
+            conn, worker_conn = context.Pipe()
+            process = context.Process(target=_serve, args=(worker_conn, map_type, capacity, function),
+                                      daemon=True)
+            process.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+    def close(self) -> None:
+        """Stops the worker processes. The map cannot be used afterwards."""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self) -> "ShardedHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_shards(self) -> int:
+        """
+        Return number of shards
+        """
+        return len(self._conns)
+
+    def _shard(self, key: str) -> int:
+        """
+        Return the shard of the given key. The hash is mixed first, so the choice of
+        shard is independent of the bucket the key takes within the shard's table.
+        """
+        return mix_hash(self._hash_function(key)) % len(self._conns)
+
+    def _send(self, conn, name: str, args: tuple) -> int:
+        """Sends a request on conn and returns its sequence number."""
+        self._sequence += 1
+        conn.send((self._sequence, name, args))
+        return self._sequence
+
+    @staticmethod
+    def _receive(conn, sequence: int) -> tuple:
+        """
+        Returns the (status, result) reply to the request with the given sequence number.
+        Replies to earlier requests, left unread when one was interrupted, are skipped;
+        a reply to a later request means the pipe is out of step and raises RuntimeError.
+        """
+        while True:
+            number, status, result = conn.recv()
+            if number == sequence:
+                return status, result
+            if number > sequence:
+                raise RuntimeError('shard replied to request ' + str(number) + ' while waiting for ' +
+                                   str(sequence))
+
+    def _call(self, shard: int, name: str, *args):
+        """Calls an operation on one shard's map and returns its result."""
+        conn = self._conns[shard]
+        status, result = self._receive(conn, self._send(conn, name, args))
+        if status == 'error':
+            raise result
+        return result
+
+    def _broadcast(self, name: str, args_by_shard=None) -> list:
+        """
+        Calls an operation on every shard (with that shard's arguments, if given) and
+        returns the results in shard order. Every request is sent before any reply is
+        read, so the shards work in parallel. Every reply is read even if a shard fails,
+        so the pipes stay in step; the first shard's error is then raised.
+        """
+        sent = []
+        error = None
+        for shard, conn in enumerate(self._conns):
+            args = args_by_shard[shard] if args_by_shard is not None else ()
+            try:
+                sent.append((conn, self._send(conn, name, args)))
+            except Exception as failure:
+                # A request that could not be sent (e.g. unpicklable) has no reply to wait for
+                error = failure
+                break
+
+        results = []
+        for conn, sequence in sent:
+            status, result = self._receive(conn, sequence)
+            if status == 'error' and error is None:
+                error = result
+            results.append(result)
+
+        if error is not None:
+            raise error
+        return results
+
+    def _split(self, keys: list) -> tuple:
+        """
+        Hashes the keys in one batch and returns, for each shard, the positions of the
+        keys that belong to it.
+        """
+        shards = len(self._conns)
+        positions = [[] for _ in range(shards)]
+        for i, hash in enumerate(hash_keys(self._hash_function, keys, True)):
+            positions[hash % shards].append(i)
+        return positions
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the shard of the key, adding it if it is not there.
+        Costs one round trip to a worker process.
+        """
+        self._call(self._shard(key), 'put', key, value)
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key, or None if the key is not in
+        the map. Costs one round trip to a worker process.
+        """
+        return self._call(self._shard(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the map, otherwise False.
+        Costs one round trip to a worker process.
+        """
+        return self._call(self._shard(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the map, if it is there.
+        Costs one round trip to a worker process.
+        """
+        self._call(self._shard(key), 'remove', key)
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every (key, value) pair in the given iterable. The pairs are split
+        by shard and each shard receives its share as one put_many, all shards at once.
+        """
+        pairs = list(pairs)
+        positions = self._split([key for key, _ in pairs])
+        self._broadcast('put_many', [([pairs[i] for i in share],) for share in positions])
+
+    def _gather(self, name: str, keys) -> DynamicArray:
+        """
+        Calls a batch lookup on every shard with its share of the keys and returns the
+        results as one dynamic array, in the order of the keys.
+        """
+        keys = list(keys)
+        positions = self._split(keys)
+        replies = self._broadcast(name, [([keys[i] for i in share],) for share in positions])
+
+        results = [None] * len(keys)
+        for share, reply in zip(positions, replies):
+            for i, result in zip(share, reply):
+                results[i] = result
+
+        out = DynamicArray()
+        for result in results:
+            out.append(result)
+        return out
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the map). Each shard is sent its keys as one batch.
+        """
+        return self._gather('get_many', keys)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the map and False otherwise. Each shard is sent its keys as one batch.
+        """
+        return self._gather('contains_many', keys)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each of the given keys from the map. Each shard is sent its keys as one batch.
+        """
+        keys = list(keys)
+        self._broadcast('remove_many', [([keys[i] for i in share],) for share in self._split(keys)])
+
+    def get_size(self) -> int:
+        """
+        Return size of map, summed over the shards
+        """
+        return sum(self._broadcast('get_size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, summed over the shards
+        """
+        return sum(self._broadcast('get_capacity'))
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor over all the shards' tables together.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of every shard, keeping their capacities.
+        """
+        self._broadcast('clear')
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the map, shard by shard.
+        """
+        tuple_arr = DynamicArray()
+        for pairs in self._broadcast('get_keys_and_values'):
+            for pair in pairs:
+                tuple_arr.append(pair)
+
+        return tuple_arr
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nbatched put_many and get_many over 4 shards")
+    print("-------------------------------------------")
+    with ShardedHashMap(4, 'sc', 11, hash_function_2) as m:
+        m.put_many(('key' + str(i), i) for i in range(1000))
+        m.remove('key3')
+        values = m.get_many(['key0', 'key3', 'key999', 'missing'])
+        print(m.get_size(), [values[i] for i in range(values.length())])
+        print(m.contains_key('key500'), m.get('key42'))
+
+    print("\nopen addressing shards")
+    print("----------------------")
+    with ShardedHashMap(3, 'oa', 11, hash_function_1) as m:
+        for i in range(100):
+            m.put(str(i), i * 10)
+        m.remove_many(str(i) for i in range(0, 100, 2))
+        print(m.get_size(), m.get_keys_and_values().length(), m.get('51'), m.get('50'))
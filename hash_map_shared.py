@@ -0,0 +1,351 @@
+# Name: Dominic Fantauzzo
+# OSU Email: fantauzd@oregonstate.edu
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Due Date: March 14, 2024,
+# Description: Read-only open addressing hash table kept in a multiprocessing.shared_memory
+#              segment. One process builds the table (SharedHashMap.create, or
+#              hash_map_oa.HashMap.share); any number of processes then attach to the
+#              segment by name and answer get and contains_key straight from the shared
+#              pages, so the table is held in RAM once however many processes use it.
+#
+# Segment layout (little-endian, sections 8-byte aligned):
+#   magic      8 bytes   b'A6HMSHM1'
+#   header     u32 length, then JSON: version, capacity, size, hash function
+#   slots      capacity * (u64 mixed hash, u64 record offset); offset 0 marks an empty slot
+#   arena      per entry: u32 key length, u32 value length, UTF-8 key, pickled value
+#
+# The capacity is a power of two at least twice the size and collisions are resolved by
+# linear probing, so every lookup ends at its key or at an empty slot. Values are stored
+# with pickle, so only attach to segments built by trusted processes.
+
+import json
+import pickle
+import struct
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import DynamicArray, HashEntry, hash_keys, mix_hash, hash_function_1, hash_function_2
+from snapshot import NAMED_FUNCTIONS, _RECORD, _align, _function_spec
+
+MAGIC = b'A6HMSHM1'
+VERSION = 1
+
+_SLOT = struct.Struct('<QQ')
+
+# Held while resource tracker registration is disabled in _attach_segment
+_untracked = threading.Lock()
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing segment without registering it with the resource tracker,
+    which would otherwise unlink it when this process exits. Before Python 3.13 (which
+    added track=False) registration is skipped by briefly disabling it; unregistering
+    afterwards instead would drop the creator's registration when the tracker is shared
+    with it, as it is in forked children.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    with _untracked:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedHashMap:
+    """
+    Read-only hash map served from a shared memory segment. A lookup hashes the key,
+    probes the slots by cached hash, and only then compares the key bytes and unpickles
+    the value, all directly on the shared buffer. Lookups never write to the segment,
+    so any number of processes may run them at once.
+    """
+
+    def __init__(self, name: str, function=None, _segment=None) -> None:
+        """
+        Attach to the segment with the given name. function is the hash function the
+        table was built with; it may be left out if it is one of snapshot's NAMED_FUNCTIONS.
+        """
+        # The slots are read in place as native u64s
+        if sys.byteorder != 'little':
+            raise ValueError('shared tables can only be used on little-endian machines')
+
+        self._segment = _segment or _attach_segment(name)
+        self._owner = _segment is not None
+        buffer = self._segment.buf
+
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(name + ' is not a shared hash table')
+        header_length = struct.unpack_from('<I', buffer, len(MAGIC))[0]
+        header = json.loads(bytes(buffer[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+        if header['version'] != VERSION:
+            self.close()
+            raise ValueError('unsupported shared table version ' + str(header['version']))
+
+        if function is None:
+            if header['function'] is None:
+                self.close()
+                raise ValueError('table was built with an unnamed hash function; pass function=')
+            function = NAMED_FUNCTIONS[header['function']](header['seed'])
+
+        self._capacity = header['capacity']
+        self._size = header['size']
+        self._hash_function = function
+
+        # Zero-copy view of the (hash, record offset) slots
+        slots_offset = _align(len(MAGIC) + 4 + header_length)
+        self._slots = buffer[slots_offset:slots_offset + _SLOT.size * self._capacity].cast('Q')
+
+    @classmethod
+    def create(cls, pairs, function: callable = hash_function_1, name: str = None) -> "SharedHashMap":
+        """
+        Build a table holding the given (key, value) pairs in a new shared memory segment,
+        named name or a random name, and return it attached. Later pairs replace earlier
+        ones with the same key. Keys must be str. The creating process owns the segment
+        and should unlink it once no process needs it any more.
+        """
+        entries = dict(pairs)
+        keys = list(entries)
+        hashes = hash_keys(function, keys, True)
+        return build_shared(((key, entries[key], hash) for key, hash in zip(keys, hashes)),
+                            len(keys), function, name)
+
+    @property
+    def name(self) -> str:
+        """Name other processes attach to the segment by."""
+        return self._segment.name
+
+    def close(self) -> None:
+        """Detach from the segment. The map cannot be used afterwards; the segment stays."""
+        slots = getattr(self, '_slots', None)
+        if slots is not None:
+            slots.release()
+            self._slots = None
+        self._segment.close()
+
+    def __del__(self) -> None:
+        # The slot view must be released before the segment's mapping can be closed
+        if getattr(self, '_segment', None) is not None:
+            self.close()
+
+    def unlink(self) -> None:
+        """
+        Free the segment once every process has closed it. Only the creating process
+        should call this, after the processes using the table are done with it.
+        """
+        self._segment.unlink()
+
+    def __enter__(self) -> "SharedHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the hash table load factor, at most 0.5. O(1)
+        """
+        return self._size / self._capacity
+
+    def _find_record(self, key: str, hash: int) -> int:
+        """Return the segment offset of the record holding key (with the given mixed hash), or -1."""
+        slots, buffer, mask = self._slots, self._segment.buf, self._capacity - 1
+        index = hash & mask
+        encoded = None
+        while True:
+            offset = slots[2 * index + 1]
+            if offset == 0:
+                return -1
+            if slots[2 * index] == hash:
+                if encoded is None:
+                    encoded = key.encode('utf-8', 'surrogatepass')
+                key_length = _RECORD.unpack_from(buffer, offset)[0]
+                start = offset + _RECORD.size
+                if key_length == len(encoded) and buffer[start:start + key_length] == encoded:
+                    return offset
+            index = (index + 1) & mask
+
+    def _value_at(self, offset: int) -> object:
+        """Return the value stored in the record at the given offset."""
+        buffer = self._segment.buf
+        key_length, value_length = _RECORD.unpack_from(buffer, offset)
+        start = offset + _RECORD.size + key_length
+        return pickle.loads(buffer[start:start + value_length])
+
+    def _key_at(self, offset: int) -> str:
+        """Return the key stored in the record at the given offset."""
+        buffer = self._segment.buf
+        key_length = _RECORD.unpack_from(buffer, offset)[0]
+        start = offset + _RECORD.size
+        return bytes(buffer[start:start + key_length]).decode('utf-8', 'surrogatepass')
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not in
+        the map. Occurs in O(1) time.
+        """
+        offset = self._find_record(key, mix_hash(self._hash_function(key)))
+        return self._value_at(offset) if offset >= 0 else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the map, otherwise it returns False.
+        Occurs in O(1) time.
+        """
+        return self._find_record(key, mix_hash(self._hash_function(key))) >= 0
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the map). Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, True)):
+            offset = self._find_record(key, hash)
+            values.append(self._value_at(offset) if offset >= 0 else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the map and False otherwise. Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, True)):
+            found.append(self._find_record(key, hash) >= 0)
+
+        return found
+
+    def __iter__(self):
+        """
+        Iterates over the entries of the map in slot order, handing each one out as a
+        HashEntry (with its mixed hash) built on the fly.
+        """
+        slots = self._slots
+        for i in range(self._capacity):
+            offset = slots[2 * i + 1]
+            if offset:
+                yield HashEntry(self._key_at(offset), self._value_at(offset), slots[2 * i])
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the map. Runs in O(N) time where N is the capacity.
+        """
+        tuple_arr = DynamicArray()
+        for entry in self:
+            tuple_arr.append((entry.key, entry.value))
+
+        return tuple_arr
+
+
+def build_shared(triples, size: int, function, name: str = None) -> SharedHashMap:
+    """
+    Build a table of size entries, given as (key, value, mixed hash) triples with distinct
+    str keys, in a new shared memory segment named name (or a random name) and return it
+    attached. mix_hash must have been applied to each key's hash under function.
+    Runs in O(N) where N is the number of entries.
+    """
+    capacity = 2
+    while capacity < 2 * size:
+        capacity *= 2
+    spec_name, seed = _function_spec(function)
+    header = json.dumps({
+        'version': VERSION,
+        'capacity': capacity,
+        'size': size,
+        'function': spec_name,
+        'seed': seed,
+    }).encode()
+
+    slots_offset = _align(len(MAGIC) + 4 + len(header))
+    arena_offset = slots_offset + _SLOT.size * capacity
+
+    # Place each entry by linear probing from its home slot, laying out its record
+    slots = [0] * (2 * capacity)
+    records = []
+    offset, mask = arena_offset, capacity - 1
+    for key, value, hash in triples:
+        if len(records) == size:
+            raise ValueError('more entries than the given size')
+        if not isinstance(key, str):
+            raise TypeError('shared table keys must be str, not ' + type(key).__name__)
+        key = key.encode('utf-8', 'surrogatepass')
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        records.append((key, value))
+
+        index = hash & mask
+        while slots[2 * index + 1]:
+            index = (index + 1) & mask
+        slots[2 * index] = hash
+        slots[2 * index + 1] = offset
+        offset += _RECORD.size + len(key) + len(value)
+
+    segment = shared_memory.SharedMemory(name=name, create=True, size=offset)
+    try:
+        buffer = segment.buf
+        buffer[:len(MAGIC)] = MAGIC
+        struct.pack_into('<I', buffer, len(MAGIC), len(header))
+        buffer[len(MAGIC) + 4:len(MAGIC) + 4 + len(header)] = header
+        struct.pack_into('<%dQ' % len(slots), buffer, slots_offset, *slots)
+
+        offset = arena_offset
+        for key, value in records:
+            _RECORD.pack_into(buffer, offset, len(key), len(value))
+            offset += _RECORD.size
+            buffer[offset:offset + len(key)] = key
+            offset += len(key)
+            buffer[offset:offset + len(value)] = value
+            offset += len(value)
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+
+    return SharedHashMap(segment.name, function, segment)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    from multiprocessing import Process, Queue
+
+    def reader(name: str, keys: list, out: Queue) -> None:
+        with SharedHashMap(name) as table:
+            out.put([table.get(key) for key in keys])
+
+    print("\nbuild in one process, read from two others")
+    print("------------------------------------------")
+    with SharedHashMap.create((('key' + str(i), i * 10) for i in range(1000)), hash_function_2) as m:
+        print(m.get_size(), m.get_capacity(), m.get('key7'), m.contains_key('nope'))
+        results = Queue()
+        readers = [Process(target=reader, args=(m.name, ['key1', 'key999', 'nope'], results))
+                   for _ in range(2)]
+        for process in readers:
+            process.start()
+        print(results.get(), results.get())
+        for process in readers:
+            process.join()
@@ -0,0 +1,396 @@
+# Name: Dominic Fantauzzo
+# OSU Email: fantauzd@oregonstate.edu
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Due Date: March 14, 2024,
+# Description: Open addressing hash map with quadratic probing that stores its table as
+#              parallel flat arrays (keys, values, cached hashes and a state byte per slot)
+#              instead of one HashEntry object per bucket.
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, hash_keys,
+                        hash_function_1, hash_function_2)
+
+# Slot states kept in the state byte array
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# Hashes are stored as unsigned 64-bit integers
+HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, tombstone_limit: float = 0.25) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and keeps its slots in parallel flat arrays.
+        Tombstones are cleared by an in-place rehash once they
+        outnumber tombstone_limit * capacity.
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+
+        # Removed entries stay behind as tombstones until a rehash clears them
+        self._tombstones = 0
+        self._tombstone_limit = tombstone_limit
+
+    def _allocate(self, capacity: int) -> None:
+        """Create empty slot arrays for the given capacity."""
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) +
+                        ' TS: ' + str(self._states[i] == TOMBSTONE) + '\n')
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the given key already exists in
+        the hash map, its associated value is replaced with the new value. If the given key is
+        not in the hash map, a new key/value pair is added. Runs in amortized O(1) time.
+        """
+
+        # Tombstones lengthen probe sequences; once there are too many, clear them in place
+        if self._tombstones > self._tombstone_limit * self._capacity:
+            self._purge_tombstones()
+
+        # If load (counting tombstones) is too high then resize to double current capacity
+        if (self._size + self._tombstones) / self._capacity >= 0.5:
+            self.resize_table(self._capacity * 2)
+
+        self._put_hashed(key, value, self._hash_function(key) & HASH_MASK)
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """Adds or updates a pair whose key hash is already known, without any load check."""
+        states, capacity = self._states, self._capacity
+        bucket_index = hash % capacity
+
+        # Quadratic probing until we find an empty slot or the key, remembering the first tombstone.
+        # A prime capacity p only lets the sequence reach (p + 1) / 2 slots, which may all be
+        # taken, so at most capacity slots are probed
+        i = 1
+        tombstone_index = -1
+        state = states[bucket_index]
+        while state != EMPTY:
+            if state == TOMBSTONE:
+                if tombstone_index < 0:
+                    tombstone_index = bucket_index
+            elif self._hashes[bucket_index] == hash and self._keys[bucket_index] == key:
+                self._values[bucket_index] = value
+                return
+
+            if i == capacity:
+                # Every reachable slot is taken: reuse a tombstone, or make room and try again
+                if tombstone_index >= 0:
+                    break
+                self._rehash(self._next_prime(capacity * 2))
+                self._put_hashed(key, value, hash)
+                return
+            bucket_index = (hash + i * i) % capacity
+            i += 1
+            state = states[bucket_index]
+
+        # The key is not in the table, so reuse the first tombstone on its path or else the empty slot
+        if tombstone_index >= 0:
+            bucket_index = tombstone_index
+            self._tombstones -= 1
+        self._keys[bucket_index] = key
+        self._values[bucket_index] = value
+        self._hashes[bucket_index] = hash
+        states[bucket_index] = LIVE
+        self._size += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds or updates every (key, value) pair in the given iterable, in order, exactly as
+        calling put on each pair would. All keys are hashed in one batch and the table is
+        resized at most once, up front. Runs in amortized O(k) where k is the number of pairs.
+        """
+        keys, values = [], []
+        for key, value in pairs:
+            keys.append(key)
+            values.append(value)
+        if not keys:
+            return
+
+        # Grow once to the capacity that putting the pairs one at a time would reach
+        new_capacity = self._capacity
+        while (self._size + len(keys) - 1) * 2 >= new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+        elif self._tombstones > self._tombstone_limit * self._capacity or \
+                (self._size + self._tombstones + len(keys) - 1) * 2 >= self._capacity:
+            self._purge_tombstones()
+
+        for key, value, hash in zip(keys, values, hash_keys(self._hash_function, keys)):
+            self._put_hashed(key, value, hash & HASH_MASK)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the underlying table, rehashing all live entries from their
+        cached hashes. Occurs in O(N) where N is the capacity.
+        """
+        if new_capacity < self._size:
+            return
+
+        # _next_prime skips 2 even though it is prime
+        if new_capacity != 2:
+            new_capacity = self._next_prime(new_capacity)
+
+        # Settle on the capacity that putting the entries one at a time would reach
+        while self._size and (self._size - 1) * 2 >= new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        self._rehash(new_capacity)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """Moves every live entry into fresh slot arrays of the given capacity."""
+        keys, values, hashes, states = self._keys, self._values, self._hashes, self._states
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._size = 0
+        self._tombstones = 0
+
+        for i in range(len(states)):
+            if states[i] == LIVE:
+                self._put_hashed(keys[i], values[i], hashes[i])
+
+    def _purge_tombstones(self) -> None:
+        """Clears all tombstones by rehashing the live entries at the current capacity."""
+        self._rehash(self._capacity)
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor. O(1)
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of buckets that do not hold a live entry. O(1)
+        """
+        return self._capacity - self._size
+
+    def _find_index(self, key: str, hash: int) -> int:
+        """
+        Returns the slot index of the live entry holding the given key, probing from its
+        already computed hash, or -1 if the key is not in the hash map.
+        """
+        states, capacity = self._states, self._capacity
+        bucket_index = hash % capacity
+
+        # At most capacity slots are probed, since those the sequence reaches may all be taken
+        i = 1
+        state = states[bucket_index]
+        while state != EMPTY:
+            if state == LIVE and self._hashes[bucket_index] == hash and self._keys[bucket_index] == key:
+                return bucket_index
+            if i == capacity:
+                break
+            bucket_index = (hash + i * i) % capacity
+            i += 1
+            state = states[bucket_index]
+
+        return -1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the hash
+        map, the method returns None. Occurs in O(1) time.
+        """
+        bucket_index = self._find_index(key, self._hash_function(key) & HASH_MASK)
+        return self._values[bucket_index] if bucket_index >= 0 else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        Occurs in O(1) time.
+        """
+        return self._find_index(key, self._hash_function(key) & HASH_MASK) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing. Occurs in O(1) time.
+        """
+        self._remove_index(self._find_index(key, self._hash_function(key) & HASH_MASK))
+
+    def _remove_index(self, bucket_index: int) -> None:
+        """Turns the live slot at the given index (if any) into a tombstone."""
+        if bucket_index < 0:
+            return
+
+        # Drop the references so removed keys and values can be freed
+        self._keys[bucket_index] = None
+        self._values[bucket_index] = None
+        self._states[bucket_index] = TOMBSTONE
+        self._size -= 1
+        self._tombstones += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the hash map). Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys)):
+            bucket_index = self._find_index(key, hash & HASH_MASK)
+            values.append(self._values[bucket_index] if bucket_index >= 0 else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the hash map and False otherwise. Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys)):
+            found.append(self._find_index(key, hash & HASH_MASK) >= 0)
+
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each of the given keys and its associated value from the hash map. Keys
+        that are not in the hash map are ignored. Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys)):
+            self._remove_index(self._find_index(key, hash & HASH_MASK))
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map. Runs in O(N) time where N is the capacity.
+        """
+        tuple_arr = DynamicArray()
+        states = self._states
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                tuple_arr.append((self._keys[i], self._values[i]))
+
+        return tuple_arr
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def __iter__(self):
+        """
+        Iterates over the live entries of the hash map. Each one is handed out as a
+        HashEntry built on the fly, since the table itself stores no entry objects.
+        """
+        states = self._states
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                yield HashEntry(self._keys[i], self._values[i], self._hashes[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
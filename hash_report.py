@@ -0,0 +1,131 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Distribution quality report for the hash functions in a6_include. Each
+#              function hashes several key sets (random, anagram-heavy, sequential and
+#              short keys). The report gives the share of distinct hashes, how evenly
+#              the hashes fill a prime and a power of two table of about one bucket per
+#              key (chi-square per degree of freedom, which is about 1 for a uniform
+#              hash; fullest bucket; empty buckets) and scalar and batch throughput.
+#
+# Usage:       python hash_report.py [--count 10000] [--seed 261] [--json report.json]
+
+import argparse
+import json
+import random
+import sys
+import time
+from itertools import product
+
+from a6_include import (hash_function_1, hash_function_2, hash_keys, next_growth_prime,
+                        seeded_fnv1a, seeded_siphash)
+from benchmark import anagram_keys, random_keys
+
+
+def sequential_keys(count: int, rnd: random.Random) -> list:
+    """Return the keys 'key0', 'key1', ... in order."""
+    return ['key' + str(i) for i in range(count)]
+
+
+def short_keys(count: int, rnd: random.Random) -> list:
+    """Return up to count distinct lowercase keys of one to three letters, shortest first."""
+    keys = []
+    for length in (1, 2, 3):
+        for letters in product('abcdefghijklmnopqrstuvwxyz', repeat=length):
+            if len(keys) == count:
+                return keys
+            keys.append(''.join(letters))
+    return keys
+
+
+KEY_SETS = {
+    'random': random_keys,
+    'anagram': anagram_keys,
+    'sequential': sequential_keys,
+    'short': short_keys,
+}
+
+
+def hash_functions(seed: int) -> dict:
+    """Return name -> hash function for every function compared, seeded from seed."""
+    return {
+        'hash_function_1': hash_function_1,
+        'hash_function_2': hash_function_2,
+        'fnv1a': seeded_fnv1a(seed),
+        'siphash': seeded_siphash(seed),
+    }
+
+
+def spread(hashes: list, capacity: int) -> dict:
+    """Return how evenly hashes fill a table of the given capacity when taken modulo it."""
+    counts = [0] * capacity
+    for hash in hashes:
+        counts[hash % capacity] += 1
+
+    expected = len(hashes) / capacity
+    chi_square = sum((count - expected) ** 2 for count in counts) / expected
+    return {
+        'capacity': capacity,
+        'chi_square_per_dof': round(chi_square / (capacity - 1), 3),
+        'max_bucket': max(counts),
+        'empty_buckets': counts.count(0),
+    }
+
+
+def keys_per_second(function, keys: list, batch: bool) -> int:
+    """Return how many keys per second the function hashes one by one or in a batch."""
+    start = time.perf_counter()
+    if batch:
+        hash_keys(function, keys)
+    else:
+        for key in keys:
+            function(key)
+    elapsed = time.perf_counter() - start
+    return round(len(keys) / elapsed) if elapsed else None
+
+
+def report(count: int = 10000, seed: int = 261, key_sets=tuple(KEY_SETS)) -> list:
+    """Measure every hash function on every key set and return one result dict per pair."""
+    results = []
+    functions = hash_functions(seed)
+    for key_set in key_sets:
+        keys = KEY_SETS[key_set](count, random.Random(seed))
+        for name, function in functions.items():
+            hashes = [function(key) for key in keys]
+            results.append({
+                'function': name,
+                'keys': key_set,
+                'count': len(keys),
+                'distinct_hashes': round(len(set(hashes)) / len(keys), 4),
+                'prime': spread(hashes, next_growth_prime(len(keys))),
+                'pow2': spread(hashes, 1 << (len(keys) - 1).bit_length()),
+                'scalar_keys_per_sec': keys_per_second(function, keys, False),
+                'batch_keys_per_sec': keys_per_second(function, keys, True),
+            })
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Report how evenly each hash function spreads keys.')
+    parser.add_argument('--count', type=int, default=10000, help='number of keys per key set')
+    parser.add_argument('--keys', nargs='+', choices=sorted(KEY_SETS), default=list(KEY_SETS))
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    results = report(args.count, args.seed, args.keys)
+
+    print(f"{'keys':<12}{'function':<17}{'distinct':>9}{'chi2 prime':>12}{'max':>6}"
+          f"{'chi2 pow2':>12}{'max':>6}{'scalar/s':>11}{'batch/s':>11}")
+    for r in results:
+        print(f"{r['keys']:<12}{r['function']:<17}{r['distinct_hashes']:>9}"
+              f"{r['prime']['chi_square_per_dof']:>12}{r['prime']['max_bucket']:>6}"
+              f"{r['pow2']['chi_square_per_dof']:>12}{r['pow2']['max_bucket']:>6}"
+              f"{r['scalar_keys_per_sec']:>11}{r['batch_keys_per_sec']:>11}")
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({'python': sys.version, 'seed': args.seed, 'results': results}, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
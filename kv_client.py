@@ -0,0 +1,161 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: asyncio client for kv_server.py. Requests are pipelined: each one is
+#              written as soon as it is made and tagged with an id, and a background task
+#              matches responses back to the waiting callers, so any number of requests
+#              (from any number of tasks) can be in flight on one connection.
+
+import asyncio
+
+from kv_server import (CLEAR, CONTAINS, CONTAINS_MANY, DEFAULT_PORT, ERROR, GET, GET_MANY, PUT,
+                       PUT_MANY, REMOVE, REMOVE_MANY, SIZE, U32, ProtocolError, Reader, pack_bytes,
+                       pack_frame, pack_key, split_frames)
+
+
+class KVError(Exception):
+    """Raised when the server reports that a request failed."""
+    pass
+
+
+class AsyncKVClient:
+    """One connection to a kv_server. Create it with connect."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                      path: str = None) -> "AsyncKVClient":
+        """Connect to the server on the Unix socket at path, or on host and port."""
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def close(self) -> None:
+        """Close the connection; requests still in flight fail with ConnectionError."""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._receiver.cancel()
+        self._fail(ConnectionError('connection closed'))
+
+    async def __aenter__(self) -> "AsyncKVClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _fail(self, error: Exception) -> None:
+        """Fail every request still waiting for its response."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _receive(self) -> None:
+        """Resolve the waiting requests as their responses arrive, until the connection ends."""
+        buffer = bytearray()
+        try:
+            while True:
+                data = await self._reader.read(256 * 1024)
+                if not data:
+                    break
+                buffer += data
+                for request_id, status, payload in split_frames(buffer):
+                    future = self._pending.pop(request_id, None)
+                    if future is None or future.done():
+                        continue
+                    if status == ERROR:
+                        future.set_exception(KVError(payload.decode()))
+                    else:
+                        future.set_result(payload)
+        except (ProtocolError, ConnectionError) as error:
+            self._fail(error)
+            return
+        self._fail(ConnectionError('server closed the connection'))
+
+    async def _request(self, code: int, payload: bytes = b'') -> Reader:
+        """Send one request and return a Reader over its response payload."""
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        frame = bytearray()
+        pack_frame(frame, request_id, code, payload)
+        self._writer.write(frame)
+        await self._writer.drain()
+        return Reader(await future)
+
+    @staticmethod
+    def _keys(keys) -> bytearray:
+        """Encode a list of keys."""
+        keys = list(keys)
+        out = bytearray(U32.pack(len(keys)))
+        for key in keys:
+            pack_key(out, key)
+        return out
+
+    async def put(self, key: str, value: bytes) -> None:
+        """Add the key with the given value, or update its value."""
+        out = bytearray()
+        pack_key(out, key)
+        pack_bytes(out, value)
+        await self._request(PUT, out)
+
+    async def get(self, key: str):
+        """Return the value of the key, or None if it is not in the map."""
+        out = bytearray()
+        pack_key(out, key)
+        return (await self._request(GET, out)).value()
+
+    async def contains_key(self, key: str) -> bool:
+        """Return whether the key is in the map."""
+        out = bytearray()
+        pack_key(out, key)
+        return (await self._request(CONTAINS, out)).u8() == 1
+
+    async def remove(self, key: str) -> None:
+        """Remove the key, if it is in the map."""
+        out = bytearray()
+        pack_key(out, key)
+        await self._request(REMOVE, out)
+
+    async def put_many(self, pairs) -> None:
+        """Add or update every (key, value) pair, in order, in one request."""
+        pairs = list(pairs)
+        out = bytearray(U32.pack(len(pairs)))
+        for key, value in pairs:
+            pack_key(out, key)
+            pack_bytes(out, value)
+        await self._request(PUT_MANY, out)
+
+    async def get_many(self, keys) -> list:
+        """Return the values of the keys (None for missing keys) in one request."""
+        reader = await self._request(GET_MANY, self._keys(keys))
+        return [reader.value() for _ in range(reader.u32())]
+
+    async def contains_many(self, keys) -> list:
+        """Return, for each of the keys, whether it is in the map, in one request."""
+        reader = await self._request(CONTAINS_MANY, self._keys(keys))
+        return [reader.u8() == 1 for _ in range(reader.u32())]
+
+    async def remove_many(self, keys) -> None:
+        """Remove each of the keys that is in the map, in one request."""
+        await self._request(REMOVE_MANY, self._keys(keys))
+
+    async def get_size(self) -> int:
+        """Return the number of pairs in the map."""
+        return (await self._request(SIZE)).u64()
+
+    async def clear(self) -> None:
+        """Remove every pair from the map."""
+        await self._request(CLEAR)
@@ -0,0 +1,195 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Load generator for kv_server.py, measuring requests per second end to end.
+#              The key set is loaded first with put_many. Then each of --processes
+#              processes opens --connections connections and keeps --depth requests in
+#              flight on each (pipelined), a --get-ratio share of them gets and the rest
+#              puts, until --requests requests have been made in total. With --batch
+#              above 1 each request is a get_many or put_many of that many keys. With
+#              --spawn a server is started on a temporary Unix socket for the run.
+#
+# Usage:       python kv_loadgen.py [--spawn] [--map oa|sc] [--unix PATH | --host H --port P]
+#                                   [--processes 1] [--connections 4] [--depth 16]
+#                                   [--requests 100000] [--batch 1] [--json out.json]
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark import percentile, random_keys
+from kv_client import AsyncKVClient
+from kv_server import DEFAULT_PORT, MAPS
+
+
+async def connection_load(client: AsyncKVClient, keys: list, requests: int, depth: int,
+                          batch: int, get_ratio: float, value: bytes, rnd: random.Random,
+                          latencies: list) -> None:
+    """Make requests on one connection, depth at a time, recording each one's latency."""
+    clock = time.perf_counter_ns
+    remaining = [requests]
+
+    async def lane() -> None:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            is_get = rnd.random() < get_ratio
+            start = clock()
+            if batch > 1:
+                chosen = rnd.sample(keys, batch)
+                if is_get:
+                    await client.get_many(chosen)
+                else:
+                    await client.put_many((key, value) for key in chosen)
+            elif is_get:
+                await client.get(rnd.choice(keys))
+            else:
+                await client.put(rnd.choice(keys), value)
+            latencies.append(clock() - start)
+
+    await asyncio.gather(*(lane() for _ in range(depth)))
+
+
+async def process_load(address: dict, keys: list, requests: int, connections: int, depth: int,
+                       batch: int, get_ratio: float, value_size: int, seed: int) -> dict:
+    """Run one process's share of the load and return its elapsed seconds and latencies."""
+    rnd = random.Random(seed)
+    value = bytes(value_size)
+    clients = [await AsyncKVClient.connect(**address) for _ in range(connections)]
+    latencies = []
+
+    start = time.perf_counter()
+    shares = [requests // connections + (i < requests % connections) for i in range(connections)]
+    await asyncio.gather(*(connection_load(client, keys, share, depth, batch, get_ratio, value,
+                                           rnd, latencies)
+                           for client, share in zip(clients, shares)))
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        await client.close()
+    return {'seconds': elapsed, 'latencies': latencies}
+
+
+def run_process(args: tuple) -> dict:
+    """Entry point of one load generating process."""
+    return asyncio.run(process_load(*args))
+
+
+async def preload(address: dict, keys: list, value_size: int, chunk: int = 10000) -> None:
+    """Put every key into the server's map, in batches."""
+    value = bytes(value_size)
+    async with await AsyncKVClient.connect(**address) as client:
+        await client.clear()
+        for i in range(0, len(keys), chunk):
+            await client.put_many((key, value) for key in keys[i:i + chunk])
+        if await client.get_size() != len(keys):
+            raise AssertionError('preload did not store every key')
+
+
+def loadgen(address: dict, processes: int = 1, connections: int = 4, depth: int = 16,
+            requests: int = 100000, keys: int = 10000, batch: int = 1, get_ratio: float = 0.9,
+            value_size: int = 32, seed: int = 261) -> dict:
+    """Load the server at address and return requests/sec, keys/sec and latency percentiles."""
+    key_list = random_keys(keys, random.Random(seed))
+    asyncio.run(preload(address, key_list, value_size))
+
+    jobs = [(address, key_list, requests // processes + (i < requests % processes), connections,
+             depth, batch, get_ratio, value_size, seed + i) for i in range(processes)]
+    start = time.perf_counter()
+    if processes == 1:
+        results = [run_process(jobs[0])]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(run_process, jobs)
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latency for result in results for latency in result['latencies'])
+    return {
+        'processes': processes,
+        'connections': connections,
+        'depth': depth,
+        'batch': batch,
+        'requests': len(ordered),
+        'seconds': round(elapsed, 6),
+        'requests_per_sec': round(len(ordered) / elapsed),
+        'keys_per_sec': round(len(ordered) * batch / elapsed),
+        'p50_us': round(percentile(ordered, 0.50) / 1000, 1),
+        'p99_us': round(percentile(ordered, 0.99) / 1000, 1),
+        'max_us': round(ordered[-1] / 1000, 1),
+    }
+
+
+def spawn_server(map_name: str, path: str) -> subprocess.Popen:
+    """Start kv_server.py on the Unix socket at path and wait until it accepts connections."""
+    server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            'kv_server.py'),
+                               '--map', map_name, '--unix', path], stdout=subprocess.DEVNULL)
+    for _ in range(200):
+        if os.path.exists(path):
+            return server
+        if server.poll() is not None:
+            raise RuntimeError('kv_server.py exited with status ' + str(server.returncode))
+        time.sleep(0.05)
+    server.kill()
+    raise RuntimeError('kv_server.py did not start')
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Measure kv_server requests per second.')
+    parser.add_argument('--spawn', action='store_true', help='start a server for the run')
+    parser.add_argument('--map', choices=sorted(MAPS), default='oa', help='map of the spawned server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help='connect to a Unix socket instead of TCP')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--connections', type=int, default=4, help='connections per process')
+    parser.add_argument('--depth', type=int, default=16, help='requests in flight per connection')
+    parser.add_argument('--requests', type=int, default=100000)
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--batch', type=int, default=1, help='keys per request (get_many/put_many above 1)')
+    parser.add_argument('--get-ratio', type=float, default=0.9)
+    parser.add_argument('--value-size', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--json', metavar='PATH', help='also write the result to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    server = None
+    directory = None
+    if args.spawn:
+        directory = tempfile.TemporaryDirectory()
+        args.unix = os.path.join(directory.name, 'kv.sock')
+        server = spawn_server(args.map, args.unix)
+    address = {'path': args.unix} if args.unix else {'host': args.host, 'port': args.port}
+
+    try:
+        result = loadgen(address, args.processes, args.connections, args.depth, args.requests,
+                         args.keys, args.batch, args.get_ratio, args.value_size, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            directory.cleanup()
+
+    print(f"{result['requests']} requests in {result['seconds']} s: {result['requests_per_sec']} "
+          f"requests/s, {result['keys_per_sec']} keys/s, p50 {result['p50_us']} us, "
+          f"p99 {result['p99_us']} us, max {result['max_us']} us")
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({
+                'python': sys.version,
+                'platform': platform.platform(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'args': vars(args),
+                'result': result,
+            }, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: asyncio key-value server around one of the hash maps, so many processes can
+#              share one warm table over TCP or a Unix socket. Requests use a compact
+#              binary protocol and may be pipelined: a client can send any number of
+#              requests without waiting, and the server answers every request that
+#              arrived in one read with a single write. Keys are str and values are
+#              bytes; the single-threaded event loop applies requests one at a time, so
+#              the map needs no locking. kv_client.py is the matching client.
+#
+# Protocol (little-endian):
+#   request    u32 body length, u32 request id, u8 opcode, payload
+#   response   u32 body length, u32 request id, u8 status, payload
+#   str/bytes  u32 length, then the UTF-8 key or the raw value
+#   value?     as bytes, but a length of 0xFFFFFFFF (and no data) means None
+#   list       u32 count, then that many items
+#
+#   opcode         payload             response payload
+#   PUT            key, value          -
+#   GET            key                 value?
+#   REMOVE         key                 -
+#   CONTAINS       key                 u8
+#   PUT_MANY       list of key, value  -
+#   GET_MANY       list of key         list of value?
+#   CONTAINS_MANY  list of key         list of u8
+#   REMOVE_MANY    list of key         -
+#   SIZE           -                   u64
+#   CLEAR          -                   -
+#
+#   A failed request gets status ERROR and a UTF-8 message as its payload.
+#
+# Usage:       python kv_server.py [--map oa|sc] [--hash 1|2|fnv1a|siphash]
+#                                  [--host 127.0.0.1] [--port 7261] [--unix PATH]
+
+import argparse
+import asyncio
+import struct
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_1, hash_function_2, seeded_fnv1a, seeded_siphash
+
+PUT = 1
+GET = 2
+REMOVE = 3
+CONTAINS = 4
+PUT_MANY = 5
+GET_MANY = 6
+CONTAINS_MANY = 7
+REMOVE_MANY = 8
+SIZE = 9
+CLEAR = 10
+
+OK = 0
+ERROR = 1
+
+# Length standing for a missing value
+NONE_LENGTH = 0xFFFFFFFF
+
+# Largest request or response body accepted
+MAX_FRAME = 64 * 1024 * 1024
+
+HEADER = struct.Struct('<IIB')
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+
+# Name -> hash map class the server can be run with
+MAPS = {
+    'oa': hash_map_oa.HashMap,
+    'sc': hash_map_sc.HashMap,
+}
+
+HASH_FUNCTIONS = {
+    '1': hash_function_1,
+    '2': hash_function_2,
+    'fnv1a': seeded_fnv1a(),
+    'siphash': seeded_siphash(),
+}
+
+DEFAULT_PORT = 7261
+
+
+class ProtocolError(Exception):
+    """Raised when a frame cannot be decoded."""
+    pass
+
+
+# ----------------------- ENCODING ----------------------------------------- #
+
+def pack_frame(out: bytearray, request_id: int, code: int, payload: bytes) -> None:
+    """Append one frame (request or response) to out."""
+    out += HEADER.pack(HEADER.size - 4 + len(payload), request_id, code)
+    out += payload
+
+
+def pack_bytes(out: bytearray, data: bytes) -> None:
+    """Append length-prefixed bytes to out."""
+    out += U32.pack(len(data))
+    out += data
+
+
+def pack_key(out: bytearray, key: str) -> None:
+    """Append a length-prefixed UTF-8 key to out."""
+    pack_bytes(out, key.encode('utf-8', 'surrogatepass'))
+
+
+def pack_value(out: bytearray, value) -> None:
+    """Append a value (bytes, or None) to out."""
+    if value is None:
+        out += U32.pack(NONE_LENGTH)
+    else:
+        pack_bytes(out, value)
+
+
+class Reader:
+    """Cursor over a payload, decoding the protocol's fields in order."""
+    __slots__ = ('_data', '_offset')
+
+    def __init__(self, data) -> None:
+        self._data = data
+        self._offset = 0
+
+    def u8(self) -> int:
+        if self._offset >= len(self._data):
+            raise ProtocolError('payload too short')
+        self._offset += 1
+        return self._data[self._offset - 1]
+
+    def u32(self) -> int:
+        if self._offset + 4 > len(self._data):
+            raise ProtocolError('payload too short')
+        self._offset += 4
+        return U32.unpack_from(self._data, self._offset - 4)[0]
+
+    def u64(self) -> int:
+        if self._offset + 8 > len(self._data):
+            raise ProtocolError('payload too short')
+        self._offset += 8
+        return U64.unpack_from(self._data, self._offset - 8)[0]
+
+    def raw(self) -> bytes:
+        length = self.u32()
+        return self._take(length)
+
+    def key(self) -> str:
+        return self.raw().decode('utf-8', 'surrogatepass')
+
+    def value(self):
+        length = self.u32()
+        return None if length == NONE_LENGTH else self._take(length)
+
+    def _take(self, length: int) -> bytes:
+        end = self._offset + length
+        if end > len(self._data):
+            raise ProtocolError('payload too short')
+        data = bytes(self._data[self._offset:end])
+        self._offset = end
+        return data
+
+
+def split_frames(buffer: bytearray) -> list:
+    """
+    Remove every complete frame from the front of buffer and return them as
+    (id, code, payload) tuples. An incomplete frame at the end is left in buffer.
+    """
+    frames = []
+    offset = 0
+    while len(buffer) - offset >= HEADER.size:
+        length, request_id, code = HEADER.unpack_from(buffer, offset)
+        if length > MAX_FRAME or length < HEADER.size - 4:
+            raise ProtocolError('bad frame length ' + str(length))
+        end = offset + 4 + length
+        if end > len(buffer):
+            break
+        frames.append((request_id, code, memoryview(buffer)[offset + HEADER.size:end].tobytes()))
+        offset = end
+    del buffer[:offset]
+    return frames
+
+
+# ----------------------- SERVER ------------------------------------------- #
+
+def execute(m, code: int, payload: bytes) -> bytes:
+    """Apply one request to the map m and return its response payload."""
+    reader = Reader(payload)
+    out = bytearray()
+
+    if code == GET:
+        pack_value(out, m.get(reader.key()))
+    elif code == PUT:
+        key = reader.key()
+        m.put(key, reader.raw())
+    elif code == CONTAINS:
+        out.append(m.contains_key(reader.key()))
+    elif code == REMOVE:
+        m.remove(reader.key())
+    elif code == GET_MANY:
+        values = m.get_many([reader.key() for _ in range(reader.u32())])
+        out += U32.pack(values.length())
+        for i in range(values.length()):
+            pack_value(out, values[i])
+    elif code == PUT_MANY:
+        m.put_many([(reader.key(), reader.raw()) for _ in range(reader.u32())])
+    elif code == CONTAINS_MANY:
+        found = m.contains_many([reader.key() for _ in range(reader.u32())])
+        out += U32.pack(found.length())
+        out += bytes(found[i] for i in range(found.length()))
+    elif code == REMOVE_MANY:
+        m.remove_many([reader.key() for _ in range(reader.u32())])
+    elif code == SIZE:
+        out += U64.pack(m.get_size())
+    elif code == CLEAR:
+        m.clear()
+    else:
+        raise ProtocolError('unknown opcode ' + str(code))
+
+    return bytes(out)
+
+
+class KVServer:
+    """Serves one hash map to every client connected over TCP or a Unix socket."""
+
+    def __init__(self, m) -> None:
+        self._map = m
+        self._server = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT, path: str = None) -> None:
+        """Start listening on the Unix socket at path, or on host and port."""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, path)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port)
+
+    def addresses(self) -> list:
+        """Return the addresses the server listens on."""
+        return [sock.getsockname() for sock in self._server.sockets]
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answer one connection's requests until it closes. Every request that arrived in
+        one read is applied in order and answered with a single write.
+        """
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(256 * 1024)
+                if not data:
+                    break
+                buffer += data
+
+                out = bytearray()
+                for request_id, code, payload in split_frames(buffer):
+                    try:
+                        pack_frame(out, request_id, OK, execute(self._map, code, payload))
+                    except Exception as error:
+                        pack_frame(out, request_id, ERROR, str(error).encode())
+                if out:
+                    writer.write(out)
+                    await writer.drain()
+        except (ProtocolError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(map_name: str = 'oa', function=hash_function_2, host: str = '127.0.0.1',
+                port: int = DEFAULT_PORT, path: str = None) -> None:
+    """Serve a new, empty map of the given kind until cancelled."""
+    server = KVServer(MAPS[map_name](11, function))
+    await server.start(host, port, path)
+    print('serving', map_name, 'on', ', '.join(map(str, server.addresses())), flush=True)
+    await server.serve_forever()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Serve a hash map over TCP or a Unix socket.')
+    parser.add_argument('--map', choices=sorted(MAPS), default='oa')
+    parser.add_argument('--hash', choices=sorted(HASH_FUNCTIONS), default='2')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.map, HASH_FUNCTIONS[args.hash], args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
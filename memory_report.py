@@ -0,0 +1,98 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Reproducible memory footprint report for the hash map implementations.
+#              Measures the bytes each map allocates per stored entry at several sizes
+#              with tracemalloc. Keys and values are created before tracing starts, so
+#              only the table structure itself is counted.
+#
+# Usage:       python memory_report.py [--sizes 1000 10000 100000] [--json report.json]
+
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+
+import hash_map_oa
+import hash_map_sc
+import hash_map_soa
+from a6_include import hash_function_2
+
+# Name -> factory for every map that is measured
+MAPS = {
+    'sc': lambda: hash_map_sc.HashMap(11, hash_function_2),
+    'oa': lambda: hash_map_oa.HashMap(11, hash_function_2),
+    'soa': lambda: hash_map_soa.HashMap(11, hash_function_2),
+}
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def make_keys(count: int, seed: int = 261) -> list:
+    """Return count distinct random lowercase keys, the same ones for a given seed."""
+    rnd = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rnd.choice(letters) for _ in range(rnd.randrange(8, 17))))
+    return sorted(keys)
+
+
+def measure(factory, pairs: list) -> dict:
+    """
+    Fill a new map from factory with pairs using put and return the bytes it holds
+    at the end and at its peak (during resizes), as totals and per entry.
+    """
+    tracemalloc.start()
+    try:
+        m = factory()
+        for key, value in pairs:
+            m.put(key, value)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'entries': len(pairs),
+        'capacity': m.get_capacity(),
+        'bytes': current,
+        'peak_bytes': peak,
+        'bytes_per_entry': round(current / len(pairs), 2),
+        'peak_bytes_per_entry': round(peak / len(pairs), 2),
+    }
+
+
+def report(sizes=DEFAULT_SIZES, maps=tuple(MAPS)) -> list:
+    """Measure every named map at every size and return one result dict per run."""
+    results = []
+    for size in sizes:
+        keys = make_keys(size)
+        pairs = [(key, i) for i, key in enumerate(keys)]
+        for name in maps:
+            result = measure(MAPS[name], pairs)
+            result['map'] = name
+            results.append(result)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Report bytes per entry for each hash map.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--maps', nargs='+', choices=sorted(MAPS), default=list(MAPS))
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    results = report(args.sizes, args.maps)
+
+    print(f"{'map':<6}{'entries':>10}{'capacity':>10}{'bytes/entry':>14}{'peak/entry':>14}")
+    for r in results:
+        print(f"{r['map']:<6}{r['entries']:>10}{r['capacity']:>10}"
+              f"{r['bytes_per_entry']:>14}{r['peak_bytes_per_entry']:>14}")
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({'python': sys.version, 'results': results}, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Throughput benchmark for ShardedHashMap as the number of worker processes
+#              grows. The keys are put with put_many and then read back with get_many,
+#              in batches of --batch keys, so each pipe round trip carries many keys;
+#              every value read back is checked. A plain in-process HashMap running the
+#              same batches gives the single-core baseline the speedups are relative to.
+#
+# Usage:       python shard_benchmark.py [--workers 1 2 4 8] [--map sc|oa]
+#                                        [--keys 200000] [--batch 10000] [--json out.json]
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+
+from a6_include import hash_function_2
+from benchmark import random_keys
+from hash_map_sharded import MAP_TYPES, ShardedHashMap
+
+DEFAULT_WORKERS = (1, 2, 4, 8)
+
+
+def replay(m, keys: list, batch: int) -> float:
+    """
+    Put every key (with its index as value) and then get every key, in batches, and
+    return the elapsed seconds. Raises AssertionError if a value read back is wrong.
+    """
+    start = time.perf_counter()
+    for i in range(0, len(keys), batch):
+        m.put_many(zip(keys[i:i + batch], range(i, i + batch)))
+    for i in range(0, len(keys), batch):
+        values = m.get_many(keys[i:i + batch])
+        for j in range(values.length()):
+            if values[j] != i + j:
+                raise AssertionError('wrong value for ' + keys[i + j])
+    return time.perf_counter() - start
+
+
+def run(workers: int, map_type: str, keys: list, batch: int, start_method: str = None) -> dict:
+    """
+    Run the batches against a ShardedHashMap with the given number of workers, or
+    against an in-process HashMap when workers is 0, and return the results.
+    """
+    if workers:
+        with ShardedHashMap(workers, map_type, 11, hash_function_2, start_method) as m:
+            elapsed = replay(m, keys, batch)
+    else:
+        elapsed = replay(MAP_TYPES[map_type](11, hash_function_2), keys, batch)
+
+    ops = 2 * len(keys)
+    return {
+        'workers': workers,
+        'map': map_type,
+        'keys': len(keys),
+        'batch': batch,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(ops / elapsed) if elapsed else None,
+    }
+
+
+def benchmark(workers=DEFAULT_WORKERS, map_type: str = 'sc', keys: int = 200000,
+              batch: int = 10000, seed: int = 261, start_method: str = None, log=None) -> list:
+    """
+    Run the in-process baseline and then every worker count, and return the result
+    dicts, each with its speedup over the baseline.
+    """
+    key_list = random_keys(keys, random.Random(seed))
+    results = []
+    base = None
+    for count in (0,) + tuple(workers):
+        result = run(count, map_type, key_list, batch, start_method)
+        base = base or result['ops_per_sec']
+        result['speedup'] = round(result['ops_per_sec'] / base, 2)
+        results.append(result)
+        if log is not None:
+            log(result)
+    return results
+
+
+def print_result(r: dict) -> None:
+    """Print one result as a row of the results table."""
+    workers = r['workers'] or 'local'
+    print(f"{workers:>8}{r['ops_per_sec']:>12}{r['speedup']:>9}", flush=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the sharded hash map across processes.')
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS)
+    parser.add_argument('--map', choices=sorted(MAP_TYPES), default='sc')
+    parser.add_argument('--keys', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=10000, help='keys per put_many/get_many call')
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--start-method', choices=multiprocessing.get_all_start_methods())
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    print(f"{multiprocessing.cpu_count()} CPUs, {args.keys} keys in batches of {args.batch}")
+    print(f"{'workers':>8}{'ops/sec':>12}{'speedup':>9}")
+    results = benchmark(args.workers, args.map, args.keys, args.batch, args.seed,
+                        args.start_method, print_result)
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({
+                'python': sys.version,
+                'platform': platform.platform(),
+                'cpus': multiprocessing.cpu_count(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'results': results,
+            }, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
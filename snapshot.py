@@ -0,0 +1,296 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Binary snapshots of the hash maps. HashMap.save writes a map's entries,
+#              grouped by bucket and with their cached hashes, to a compact file; load
+#              opens that file as a read-only SnapshotMap that answers get and
+#              contains_key straight from the (by default memory-mapped) file, so a
+#              large table is ready to serve without a single put or rehash.
+#
+# File layout (little-endian, sections 8-byte aligned):
+#   magic      8 bytes   b'A6HMSNAP'
+#   header     u32 length, then JSON: version, capacity, size, hash function, mix
+#   starts     (capacity + 1) u64  entry index where each bucket's entries begin
+#   entries    size * (u64 hash, u64 record offset), grouped by bucket
+#   records    per entry: u32 key length, u32 value length, UTF-8 key, pickled value
+#
+# Values are stored with pickle, so only load snapshots from trusted sources.
+
+import json
+import mmap as mmap_module
+import pickle
+import struct
+import sys
+
+from a6_include import (MASK_64, DynamicArray, HashEntry, hash_keys, mix_hash,
+                        hash_function_1, hash_function_2, seeded_fnv1a, seeded_siphash)
+
+MAGIC = b'A6HMSNAP'
+VERSION = 1
+
+# Hash functions a snapshot can name, so load can rebuild them without being given one
+NAMED_FUNCTIONS = {
+    'hash_function_1': lambda seed: hash_function_1,
+    'hash_function_2': lambda seed: hash_function_2,
+    'fnv1a': seeded_fnv1a,
+    'siphash24': seeded_siphash,
+}
+
+_RECORD = struct.Struct('<II')
+
+
+def _align(offset: int) -> int:
+    """Round offset up to a multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def _function_spec(function) -> tuple:
+    """Return the (name, seed) a snapshot records for function; name is None if unknown."""
+    name = getattr(function, '__name__', None)
+    if name in ('hash_function_1', 'hash_function_2'):
+        return name, None
+    if name in NAMED_FUNCTIONS and hasattr(function, 'seed'):
+        return name, function.seed
+    return None, None
+
+
+def write_snapshot(path: str, triples, size: int, capacity: int, function, mix: bool) -> None:
+    """
+    Write a snapshot of a map holding size entries, given as (key, value, hash) triples,
+    laid out in capacity buckets. mix tells whether the cached hashes went through
+    mix_hash. Keys must be str. Runs in O(N + capacity) where N is the number of entries.
+    """
+    name, seed = _function_spec(function)
+    header = json.dumps({
+        'version': VERSION,
+        'capacity': capacity,
+        'size': size,
+        'function': name,
+        'seed': seed,
+        'mix': mix,
+    }).encode()
+
+    # Group the entries by bucket (counting sort), remembering each one's record
+    records = []
+    counts = [0] * (capacity + 1)
+    for key, value, hash in triples:
+        if not isinstance(key, str):
+            raise TypeError('snapshot keys must be str, not ' + type(key).__name__)
+        hash &= MASK_64
+        records.append((hash % capacity, hash, key.encode('utf-8', 'surrogatepass'),
+                        pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+        counts[hash % capacity + 1] += 1
+    for i in range(capacity):
+        counts[i + 1] += counts[i]
+    records.sort(key=lambda record: record[0])
+
+    starts_offset = _align(len(MAGIC) + 4 + len(header))
+    records_offset = starts_offset + 8 * (capacity + 1) + 16 * len(records)
+
+    entries = []
+    offset = records_offset
+    for _, hash, key, value in records:
+        entries += (hash, offset)
+        offset += _RECORD.size + len(key) + len(value)
+
+    with open(path, 'wb') as out:
+        out.write(MAGIC)
+        out.write(struct.pack('<I', len(header)))
+        out.write(header)
+        out.write(bytes(starts_offset - len(MAGIC) - 4 - len(header)))
+        out.write(struct.pack('<%dQ' % len(counts), *counts))
+        out.write(struct.pack('<%dQ' % len(entries), *entries))
+        for _, _, key, value in records:
+            out.write(_RECORD.pack(len(key), len(value)))
+            out.write(key)
+            out.write(value)
+
+
+class SnapshotMap:
+    """
+    Read-only hash map served from a snapshot file. A lookup hashes the key, scans the
+    few entries of its bucket by cached hash, and only then compares the key bytes and
+    unpickles the value, all directly on the file's buffer.
+    """
+
+    def __init__(self, path: str, mmap: bool = True, function=None) -> None:
+        """
+        Open the snapshot at path, memory-mapped unless mmap is False (then it is read
+        into memory). function is the hash function the map was saved with; it may be
+        left out if the snapshot names one of the NAMED_FUNCTIONS.
+        """
+        # The bucket starts and entries are read in place as native u64s
+        if sys.byteorder != 'little':
+            raise ValueError('snapshots can only be loaded on little-endian machines')
+
+        self._file = open(path, 'rb')
+        self._mmap = None
+        if mmap:
+            self._mmap = mmap_module.mmap(self._file.fileno(), 0, access=mmap_module.ACCESS_READ)
+            buffer = self._mmap
+        else:
+            buffer = self._file.read()
+            self._file.close()
+        self._buffer = buffer
+
+        if buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(path + ' is not a hash map snapshot')
+        header_length = struct.unpack_from('<I', buffer, len(MAGIC))[0]
+        header = json.loads(bytes(buffer[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+        if header['version'] != VERSION:
+            self.close()
+            raise ValueError('unsupported snapshot version ' + str(header['version']))
+
+        if function is None:
+            if header['function'] is None:
+                self.close()
+                raise ValueError('snapshot was saved with an unnamed hash function; pass function=')
+            function = NAMED_FUNCTIONS[header['function']](header['seed'])
+
+        self._capacity = header['capacity']
+        self._size = header['size']
+        self._hash_function = function
+        self._mix = header['mix']
+
+        # Zero-copy views of the bucket starts and the (hash, record offset) entries
+        view = memoryview(buffer)
+        starts_offset = _align(len(MAGIC) + 4 + header_length)
+        entries_offset = starts_offset + 8 * (self._capacity + 1)
+        self._view = view
+        self._starts = view[starts_offset:entries_offset].cast('Q')
+        self._entries = view[entries_offset:entries_offset + 16 * self._size].cast('Q')
+
+    def close(self) -> None:
+        """Release the file and its mapping. The map cannot be used afterwards."""
+        for name in ('_starts', '_entries', '_view'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the hash table load factor of the saved map. O(1)
+        """
+        return self._size / self._capacity
+
+    def _hash(self, key: str) -> int:
+        """Return the key's hash as the saved map cached it."""
+        hash = self._hash_function(key)
+        return mix_hash(hash) if self._mix else hash & MASK_64
+
+    def _find_record(self, key: str, hash: int) -> int:
+        """Return the file offset of the record holding key (with the given hash), or -1."""
+        bucket = hash % self._capacity
+        entries, buffer = self._entries, self._buffer
+        encoded = None
+        for i in range(self._starts[bucket], self._starts[bucket + 1]):
+            if entries[2 * i] == hash:
+                offset = entries[2 * i + 1]
+                if encoded is None:
+                    encoded = key.encode('utf-8', 'surrogatepass')
+                key_length = _RECORD.unpack_from(buffer, offset)[0]
+                start = offset + _RECORD.size
+                if key_length == len(encoded) and buffer[start:start + key_length] == encoded:
+                    return offset
+        return -1
+
+    def _value_at(self, offset: int) -> object:
+        """Return the value stored in the record at the given offset."""
+        key_length, value_length = _RECORD.unpack_from(self._buffer, offset)
+        start = offset + _RECORD.size + key_length
+        return pickle.loads(self._view[start:start + value_length])
+
+    def _key_at(self, offset: int) -> str:
+        """Return the key stored in the record at the given offset."""
+        key_length = _RECORD.unpack_from(self._buffer, offset)[0]
+        start = offset + _RECORD.size
+        return bytes(self._view[start:start + key_length]).decode('utf-8', 'surrogatepass')
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not in
+        the map. Occurs in O(1) time.
+        """
+        offset = self._find_record(key, self._hash(key))
+        return self._value_at(offset) if offset >= 0 else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the map, otherwise it returns False.
+        Occurs in O(1) time.
+        """
+        return self._find_record(key, self._hash(key)) >= 0
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, the value associated with each of the
+        given keys (None for keys not in the map). Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        values = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._mix)):
+            offset = self._find_record(key, hash & MASK_64)
+            values.append(self._value_at(offset) if offset >= 0 else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array holding, in order, True for each of the given keys that is
+        in the map and False otherwise. Keys are hashed in one batch.
+        """
+        keys = list(keys)
+        found = DynamicArray()
+        for key, hash in zip(keys, hash_keys(self._hash_function, keys, self._mix)):
+            found.append(self._find_record(key, hash & MASK_64) >= 0)
+
+        return found
+
+    def __iter__(self):
+        """
+        Iterates over the entries of the map in bucket order, handing each one out as a
+        HashEntry built on the fly.
+        """
+        entries = self._entries
+        for i in range(self._size):
+            offset = entries[2 * i + 1]
+            yield HashEntry(self._key_at(offset), self._value_at(offset), entries[2 * i])
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the map. Runs in O(N) time where N is the number of entries.
+        """
+        tuple_arr = DynamicArray()
+        for entry in self:
+            tuple_arr.append((entry.key, entry.value))
+
+        return tuple_arr
+
+
+def load(path: str, mmap: bool = True, function=None) -> SnapshotMap:
+    """Open the snapshot at path as a read-only SnapshotMap (see SnapshotMap)."""
+    return SnapshotMap(path, mmap, function)
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = 'import random, benchmark; print(benchmark.random_keys(2000, random.Random(5))[:50])'
+
+
+def keys_under_hash_seed(seed: str) -> str:
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    return subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_random_keys_do_not_depend_on_the_hash_seed():
+    assert keys_under_hash_seed('1') == keys_under_hash_seed('2')
+
+
+def test_random_keys_are_distinct():
+    import random
+    import benchmark
+
+    keys = benchmark.random_keys(5000, random.Random(1))
+    assert len(keys) == len(set(keys)) == 5000
+
+
+def test_every_map_replays_a_workload():
+    import benchmark
+
+    for name in benchmark.MAPS:
+        result = benchmark.run(name, 'uniform', 300, memory=False)
+        assert result['map'] == name and result['ops'] == 600
+
+
+def test_variants_configure_their_maps():
+    import benchmark
+    from a6_include import hash_function_2
+
+    assert benchmark.MAPS['oa-linear'](hash_function_2)._probe.__name__ == 'linear_probe'
+    assert benchmark.MAPS['oa-pow2'](hash_function_2)._power_of_two
+    assert benchmark.MAPS['oa-step4'](hash_function_2)._rehash_step == 4
+    assert benchmark.MAPS['sc-pow2'](hash_function_2)._power_of_two
+    assert benchmark.MAPS['sc-step4'](hash_function_2)._rehash_step == 4
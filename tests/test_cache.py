@@ -0,0 +1,92 @@
+import random
+from collections import OrderedDict
+
+import pytest
+
+from a6_include import hash_function_2
+from hash_map_cache import Cache, LFUCache, LRUCache
+
+
+def test_cache_is_abstract():
+    with pytest.raises(TypeError):
+        Cache(10)
+
+
+@pytest.mark.parametrize('map_type', ['sc', 'oa'])
+@pytest.mark.parametrize('capacity', [1, 2, 5, 17])
+def test_lru_matches_reference(map_type, capacity):
+    rnd = random.Random(capacity)
+    cache = LRUCache(capacity, function=hash_function_2, map_type=map_type)
+    ref = OrderedDict()
+    evictions = 0
+
+    for step in range(3000):
+        key = 'k' + str(rnd.randrange(40))
+        op = rnd.random()
+        if op < 0.5:
+            assert cache.get(key) == ref.get(key)
+            if key in ref:
+                ref.move_to_end(key)
+        elif op < 0.9:
+            cache.put(key, step)
+            ref[key] = step
+            ref.move_to_end(key)
+            while len(ref) > capacity:
+                ref.popitem(last=False)
+                evictions += 1
+        else:
+            cache.remove(key)
+            ref.pop(key, None)
+        assert list(cache.keys()) == list(ref)
+
+    assert cache.stats()['evictions'] == evictions
+
+
+@pytest.mark.parametrize('map_type', ['sc', 'oa'])
+@pytest.mark.parametrize('capacity', [1, 2, 5, 17])
+def test_lfu_matches_reference(map_type, capacity):
+    rnd = random.Random(capacity)
+    cache = LFUCache(capacity, function=hash_function_2, map_type=map_type)
+    # key -> [value, uses, time of last use]; the victim has the fewest uses, then the oldest
+    ref = {}
+    order = lambda key: (ref[key][1], ref[key][2])
+
+    for step in range(3000):
+        key = 'k' + str(rnd.randrange(40))
+        op = rnd.random()
+        if op < 0.5:
+            value = cache.get(key)
+            if key in ref:
+                ref[key][1] += 1
+                ref[key][2] = step
+                assert value == ref[key][0]
+            else:
+                assert value is None
+        elif op < 0.9:
+            if key in ref:
+                ref[key] = [step, ref[key][1] + 1, step]
+            else:
+                ref[key] = [step, 1, step]
+            cache.put(key, step)
+            while len(ref) > capacity:
+                del ref[min((other for other in ref if other != key), key=order)]
+        else:
+            cache.remove(key)
+            ref.pop(key, None)
+        assert list(cache.keys()) == sorted(ref, key=order)
+        assert all(cache.frequency(other) == ref[other][1] for other in ref)
+
+
+@pytest.mark.parametrize('cache_class', [LRUCache, LFUCache])
+def test_byte_bound(cache_class):
+    rnd = random.Random(3)
+    cache = cache_class(max_bytes=500, sizeof=lambda key, value: len(value))
+    for _ in range(2000):
+        cache.put('k' + str(rnd.randrange(60)), bytes(rnd.randrange(1, 200)))
+        cache.get('k' + str(rnd.randrange(60)))
+        assert cache.get_bytes() <= 500
+
+    cache.put('big', bytes(501))
+    assert not cache.contains_key('big')
+    cache.clear()
+    assert cache.get_size() == cache.get_bytes() == 0 and list(cache.keys()) == []
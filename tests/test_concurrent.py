@@ -0,0 +1,162 @@
+import threading
+
+from a6_include import hash_function_2
+from hash_map_concurrent import ConcurrentHashMap
+
+
+def run_with_timeout(target, seconds: float = 10) -> None:
+    """Run target on a daemon thread and fail if it does not finish in time (a deadlock)."""
+    errors = []
+
+    def wrapper():
+        try:
+            target()
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=wrapper, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), 'operation deadlocked'
+    if errors:
+        raise errors[0]
+
+
+def test_put_many_that_grows_the_table():
+    m = ConcurrentHashMap(11, hash_function_2, stripes=4)
+    pairs = [('k' + str(i), i) for i in range(100)]
+
+    run_with_timeout(lambda: m.put_many(pairs))
+
+    assert m.get_size() == 100
+    assert m.get_capacity() >= 100
+    assert all(m.get(key) == value for key, value in pairs)
+
+
+def test_put_many_grows_while_other_threads_put():
+    m = ConcurrentHashMap(11, hash_function_2, stripes=8)
+
+    def putter(n):
+        for i in range(500):
+            m.put('p' + str(n) + '-' + str(i), i)
+
+    def batcher(n):
+        for start in range(0, 500, 50):
+            m.put_many(('b' + str(n) + '-' + str(i), i) for i in range(start, start + 50))
+
+    def run():
+        threads = ([threading.Thread(target=putter, args=(n,)) for n in range(4)] +
+                   [threading.Thread(target=batcher, args=(n,)) for n in range(4)])
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run_with_timeout(run, 60)
+
+    assert m.get_size() == 4000
+    assert m.get('b3-499') == 499 and m.get('p0-0') == 0
+    assert sum(1 for _ in m.keys()) == 4000
+
+
+def test_resize_table_and_hooks():
+    m = ConcurrentHashMap(11, hash_function_2)
+    events = []
+    m.add_hook(events.append)
+    run_with_timeout(lambda: [m.put('k' + str(i), i) for i in range(50)])
+    run_with_timeout(lambda: m.resize_table(200))
+
+    assert m.get_size() == 50 and m.get_capacity() >= 200
+    assert any(event.resized for event in events)
+
+
+class FakeClock:
+    """Stands in for time.monotonic, so expiry can be tested without sleeping."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_is_checked_under_the_stripe_lock():
+    m = ConcurrentHashMap(11, hash_function_2, stripes=4)
+    clock = m._clock = FakeClock()
+    m.put('short', 1, ttl=5)
+    m.put('long', 2, ttl=50)
+    m.put('forever', 3)
+    m.put('renewed', 4, ttl=5)
+    m.put('renewed', 5)
+
+    clock.now += 10
+    assert m.get('short') is None and not m.contains_key('short')
+    assert m.get('long') == 2 and m.get('forever') == 3 and m.get('renewed') == 5
+    assert m.get_size() == 3
+    assert sorted(m.keys()) == ['forever', 'long', 'renewed']
+
+
+def test_expire_locks_each_stripe_it_sweeps():
+    m = ConcurrentHashMap(11, hash_function_2, stripes=4)
+    clock = m._clock = FakeClock()
+    for i in range(200):
+        m.put('k' + str(i), i, ttl=5 if i % 2 else None)
+    clock.now += 10
+
+    removed = []
+    sweeper = threading.Thread(target=lambda: removed.append(m.expire()), daemon=True)
+    with m._locks[2]:
+        sweeper.start()
+        sweeper.join(0.2)
+        assert sweeper.is_alive(), 'expire swept a stripe without its lock'
+    sweeper.join(10)
+
+    assert removed == [100] and m.get_size() == 100
+    assert all(m.get('k' + str(i)) == (None if i % 2 else i) for i in range(200))
+
+
+def test_whole_map_operations_that_expire_do_not_deadlock():
+    m = ConcurrentHashMap(11, hash_function_2, stripes=4)
+    clock = m._clock = FakeClock()
+    for i in range(100):
+        m.put('k' + str(i), i, ttl=5 if i % 2 else None)
+    clock.now += 10
+
+    result = []
+    run_with_timeout(lambda: result.append(m.get_keys_and_values()))
+    assert result[0].length() == m.get_size() == 50
+
+    # Growing sweeps first, and the expired pairs make enough room for these
+    for i in range(100):
+        m.put('k' + str(i), i, ttl=5 if i % 2 else None)
+    capacity = m.get_capacity()
+    clock.now += 10
+    added = capacity * 3 // 4 - 50
+    run_with_timeout(lambda: [m.put('n' + str(i), i) for i in range(added)])
+    assert m.get_capacity() == capacity and m.get_size() == 50 + added
+
+
+def test_expire_while_other_threads_put_with_ttl():
+    m = ConcurrentHashMap(11, hash_function_2, stripes=8)
+
+    def putter(n):
+        for i in range(1000):
+            m.put('p' + str(n) + '-' + str(i), i, ttl=0 if i % 2 else None)
+
+    def sweeper():
+        for _ in range(20):
+            m.expire(0.001)
+
+    def run():
+        threads = ([threading.Thread(target=putter, args=(n,)) for n in range(4)] +
+                   [threading.Thread(target=sweeper) for _ in range(2)])
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run_with_timeout(run, 60)
+    m.expire()
+
+    assert m.get_size() == 2000 == sum(1 for _ in m.keys())
+    assert m.get('p2-10') == 10 and m.get('p2-11') is None
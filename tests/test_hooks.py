@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_2
+from hash_map_concurrent import ConcurrentHashMap
+
+MAPS = [hash_map_sc.HashMap, hash_map_oa.HashMap, ConcurrentHashMap]
+
+# Far longer than any of the operations below takes
+DELAY = 0.05
+
+
+@pytest.mark.parametrize('map_class', MAPS)
+def test_probe_count_and_hooks_are_not_timed(map_class):
+    m = map_class(11, hash_function_2)
+    probe_length = m._probe_length
+
+    def slow_probe_length(key):
+        time.sleep(DELAY)
+        return probe_length(key)
+
+    m._probe_length = slow_probe_length
+    events = []
+    m.add_hook(events.append)
+    m.add_hook(lambda event: time.sleep(DELAY))
+
+    m.put('a', 1)
+    m.get('a')
+    m.contains_key('b')
+    m.remove('a')
+    m.clear()
+
+    assert [event.operation for event in events] == ['put', 'get', 'contains_key', 'remove', 'clear']
+    assert all(event.seconds < DELAY for event in events)
+    assert all(event.probes is not None for event in events[:4]) and events[4].probes is None
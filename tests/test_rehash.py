@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import seeded_fnv1a
+
+MAPS = [
+    ('sc', lambda step: hash_map_sc.HashMap(11, seeded_fnv1a(1), rehash_step=step)),
+    ('sc-pow2', lambda step: hash_map_sc.HashMap(11, seeded_fnv1a(1), 'pow2', rehash_step=step)),
+    ('oa', lambda step: hash_map_oa.HashMap(11, seeded_fnv1a(1), rehash_step=step)),
+    ('oa-linear', lambda step: hash_map_oa.HashMap(11, seeded_fnv1a(1), probing='linear', rehash_step=step)),
+    ('oa-pow2', lambda step: hash_map_oa.HashMap(11, seeded_fnv1a(1), probing='linear',
+                                                 capacity_mode='pow2', rehash_step=step)),
+]
+
+
+def count_forced_finishes(m) -> list:
+    """Wrap m._finish_rehash to record each call made while a resize is still in progress."""
+    forced = []
+    finish = m._finish_rehash
+
+    def recording():
+        if m._old_buckets is not None:
+            forced.append(m._rehash_index)
+        finish()
+
+    m._finish_rehash = recording
+    return forced
+
+
+@pytest.mark.parametrize('step', [1, 2, 8])
+@pytest.mark.parametrize('name,factory', MAPS, ids=[name for name, _ in MAPS])
+def test_steady_insertion_never_forces_a_finish(name, factory, step):
+    m = factory(step)
+    forced = count_forced_finishes(m)
+    for i in range(20000):
+        m.put('key' + str(i), i)
+
+    assert forced == []
+    assert m._resizes > 5
+    assert m.get_size() == 20000 and m.get('key12345') == 12345
+
+
+@pytest.mark.parametrize('name,factory', MAPS, ids=[name for name, _ in MAPS])
+def test_steady_churn_never_forces_a_finish(name, factory):
+    rnd = random.Random(2)
+    m = factory(1)
+    forced = count_forced_finishes(m)
+    ref = {}
+    for i in range(30000):
+        key = 'key' + str(rnd.randrange(i + 1))
+        if rnd.random() < 0.3:
+            m.remove(key)
+            ref.pop(key, None)
+        else:
+            m.put(key, i)
+            ref[key] = i
+
+    assert forced == []
+    assert m.get_size() == len(ref)
+    assert all(m.get(key) == value for key, value in ref.items())
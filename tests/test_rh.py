@@ -0,0 +1,34 @@
+import pytest
+
+from a6_include import hash_function_2
+from hash_map_rh import HashMap
+
+
+@pytest.mark.parametrize('max_load', [0, -0.5, 1, 1.5])
+def test_max_load_must_be_below_one(max_load):
+    with pytest.raises(ValueError):
+        HashMap(11, hash_function_2, max_load)
+
+
+def test_absent_keys_are_found_missing_at_a_high_load():
+    m = HashMap(11, hash_function_2, 0.99)
+    for i in range(500):
+        m.put('key' + str(i), i)
+    assert m.table_load() <= 0.99
+    assert m.get('missing') is None and not m.contains_key('also missing')
+    assert all(m.get('key' + str(i)) == i for i in range(500))
+
+
+def test_weak_hashes_do_not_form_one_long_cluster():
+    # hash_function_2 maps these keys into a narrow range of small ints; used as home
+    # buckets directly they made one run over 1400 slots long
+    m = HashMap(11, hash_function_2)
+    for i in range(2000):
+        m.put('key' + str(i), i)
+    assert max(m._dists) < 100
+    assert all(m.get('key' + str(i)) == i for i in range(2000))
+    values = m.get_many(['key7', 'nope'])
+    assert values.get_at_index(0) == 7 and values.get_at_index(1) is None
+    m.remove_many(['key' + str(i) for i in range(0, 2000, 2)])
+    found = m.contains_many(['key0', 'key1'])
+    assert m.get_size() == 1000 and not found.get_at_index(0) and found.get_at_index(1)
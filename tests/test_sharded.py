@@ -0,0 +1,44 @@
+import pytest
+
+from a6_include import hash_function_2
+from hash_map_sharded import ShardedHashMap
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise TypeError('cannot pickle Unpicklable')
+
+
+@pytest.fixture
+def sharded():
+    with ShardedHashMap(3, 'sc', 11, hash_function_2) as m:
+        m.put_many(('key' + str(i), i) for i in range(30))
+        yield m
+
+
+def test_batch_results_in_key_order(sharded):
+    values = sharded.get_many(['key0', 'missing', 'key29'])
+    assert [values[i] for i in range(values.length())] == [0, None, 29]
+    assert sharded.get_size() == 30
+
+
+def test_failed_broadcast_leaves_the_pipes_in_step(sharded):
+    # The first shard fails, so the replies of the others must still be read
+    with pytest.raises(TypeError):
+        sharded._broadcast('get_many', [(None,), (['key1'],), (['key2'],)])
+
+    assert sharded.get('key7') == 7
+    assert sharded.get_size() == 30
+    values = sharded.get_many(['key1', 'key2'])
+    assert [values[i] for i in range(values.length())] == [1, 2]
+
+
+def test_unknown_operation_and_unsendable_request(sharded):
+    with pytest.raises(AttributeError):
+        sharded._broadcast('resize_table', [(5,)] * sharded.get_shards())
+    assert sharded.get_size() == 30
+
+    with pytest.raises(Exception):
+        sharded.put_many([('key' + str(i), Unpicklable()) for i in range(10)])
+    assert sharded.get('key3') == 3
+    assert sharded.contains_key('key29')
@@ -0,0 +1,79 @@
+import random
+import threading
+
+import pytest
+
+from a6_include import hash_function_1, hash_function_2, seeded_siphash
+from hash_map_soa import HashMap
+
+
+def run_with_timeout(target, seconds: float = 30) -> None:
+    """Run target on a daemon thread and fail if it does not finish in time (an endless probe)."""
+    errors = []
+
+    def wrapper():
+        try:
+            target()
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=wrapper, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), 'operation never finished'
+    if errors:
+        raise errors[0]
+
+
+def test_absent_key_when_every_reachable_slot_is_taken():
+    # With capacity 7 the probe sequence of hash 0 only reaches slots 0, 1, 2 and 4
+    m = HashMap(7, lambda key: int(key))
+    for key in '0124':
+        m.put(key, key)
+
+    def lookups():
+        assert m.get('7') is None
+        assert not m.contains_key('14')
+        m.remove('21')
+        assert m.get_size() == 4
+
+    run_with_timeout(lookups)
+
+
+@pytest.mark.parametrize('function', [hash_function_1, hash_function_2, seeded_siphash(7)],
+                         ids=['hash_function_1', 'hash_function_2', 'siphash'])
+def test_matches_dict(function):
+    def fuzz():
+        rnd = random.Random(5)
+        m = HashMap(7, function)
+        ref = {}
+        for step in range(20000):
+            key = 'k' + str(rnd.randrange(300))
+            op = rnd.random()
+            if op < 0.4:
+                m.put(key, step)
+                ref[key] = step
+            elif op < 0.6:
+                assert m.get(key) == ref.get(key)
+            elif op < 0.75:
+                m.remove(key)
+                ref.pop(key, None)
+            elif op < 0.8:
+                keys = ['k' + str(rnd.randrange(300)) for _ in range(8)]
+                m.remove_many(keys)
+                for other in keys:
+                    ref.pop(other, None)
+            elif op < 0.85:
+                pairs = [('k' + str(rnd.randrange(300)), step) for _ in range(8)]
+                m.put_many(pairs)
+                ref.update(pairs)
+            else:
+                keys = ['k' + str(rnd.randrange(600)) for _ in range(8)]
+                values = m.get_many(keys)
+                assert [values[i] for i in range(values.length())] == [ref.get(k) for k in keys]
+            assert m.get_size() == len(ref)
+
+        pairs = m.get_keys_and_values()
+        assert sorted(pairs[i] for i in range(pairs.length())) == sorted(ref.items())
+
+    run_with_timeout(fuzz, 120)
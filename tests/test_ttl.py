@@ -0,0 +1,145 @@
+import pytest
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import OperationCounter, hash_function_2
+
+MAPS = [hash_map_sc.HashMap, hash_map_oa.HashMap]
+
+
+class FakeClock:
+    """Stands in for time.monotonic, so expiry can be tested without sleeping."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make(map_class, capacity: int = 11):
+    m = map_class(capacity, hash_function_2)
+    clock = m._clock = FakeClock()
+    return m, clock
+
+
+@pytest.mark.parametrize('map_class', MAPS)
+def test_expired_keys_are_absent(map_class):
+    m, clock = make(map_class)
+    m.put('short', 1, ttl=5)
+    m.put('long', 2, ttl=50)
+    m.put('forever', 3)
+
+    clock.now += 10
+    assert m.get('short') is None and not m.contains_key('short')
+    assert m.get('long') == 2 and m.get('forever') == 3
+    assert m.get_size() == 2
+
+
+@pytest.mark.parametrize('map_class', MAPS)
+def test_ttl_with_hooks(map_class):
+    m, clock = make(map_class)
+    counter = OperationCounter()
+    m.add_hook(counter)
+
+    m.put('a', 1, ttl=5)
+    m.put('b', 2)
+    clock.now += 10
+    assert m.get('a') is None and m.get('b') == 2
+    assert counter.totals['put']['calls'] == 2
+    assert counter.totals['get']['calls'] == 2
+
+
+@pytest.mark.parametrize('map_class', MAPS)
+def test_save_and_load_skip_expired_keys(map_class, tmp_path):
+    m, clock = make(map_class)
+    for i in range(60):
+        m.put('key' + str(i), i, ttl=5 if i % 6 == 0 else None)
+    clock.now += 10
+
+    path = str(tmp_path / 'map.snap')
+    m.save(path)
+    loaded = map_class.load(path)
+    try:
+        pairs = loaded.get_keys_and_values()
+        assert loaded.get_size() == pairs.length() == 50
+        assert sorted(pairs[i] for i in range(pairs.length())) == \
+            sorted(('key' + str(i), i) for i in range(60) if i % 6)
+        assert loaded.get('key0') is None and loaded.get('key1') == 1
+    finally:
+        loaded.close()
+
+
+def test_share_skips_expired_keys():
+    m, clock = make(hash_map_oa.HashMap)
+    for i in range(60):
+        m.put('key' + str(i), i, ttl=5 if i % 6 == 0 else None)
+    clock.now += 10
+
+    with m.share() as table:
+        assert table.get_size() == table.get_keys_and_values().length() == 50
+        assert table.get('key6') is None and table.get('key7') == 7
+
+
+@pytest.mark.parametrize('map_class', MAPS)
+def test_nested_iteration_after_expiry(map_class):
+    m, clock = make(map_class)
+    for i in range(20):
+        m.put('key' + str(i), i, ttl=5 if i % 4 == 0 else None)
+
+    # Keys expire while an iteration is running; starting (and finishing) another one,
+    # or looking up an expired key, must not disturb it
+    keys = m.keys()
+    seen = [next(keys)]
+    clock.now += 10
+    assert sum(1 for _ in m.items()) == 15
+    assert m.get('key0') is None and m.get('key4') is None and not m.contains_key('key8')
+    seen.extend(keys)
+    assert set(seen) >= set('key' + str(i) for i in range(20) if i % 4)
+
+    pairs = []
+    for key in m.keys():
+        assert sum(1 for _ in m.values()) == 15
+        pairs.append((key, m.get(key)))
+    assert sorted(pairs) == sorted(('key' + str(i), i) for i in range(20) if i % 4)
+
+    with pytest.raises(RuntimeError):
+        for key in m.keys():
+            m.put('new' + key, 0)
+
+
+@pytest.mark.parametrize('map_class', MAPS)
+def test_expired_keys_are_reclaimed_by_writes_and_expire(map_class):
+    m, clock = make(map_class)
+    for i in range(200):
+        m.put('old' + str(i), i, ttl=1)
+    clock.now += 2
+
+    capacity = m.get_capacity()
+    for i in range(200):
+        m.put('new' + str(i), i, ttl=1)
+    assert m.get_capacity() == capacity
+    assert m.get_size() <= 250
+
+    clock.now += 2
+    m.expire()
+    assert m.get_size() == 0
+    assert list(m.items()) == [] and m.get_keys_and_values().length() == 0
+
+
+def test_reclaiming_from_a_sorted_bucket_during_iteration():
+    # hash_function_1 sums the characters, so these keys all share one treeified bucket
+    m = hash_map_sc.HashMap(11, treeify_threshold=2)
+    clock = m._clock = FakeClock()
+    keys = ['abc', 'acb', 'bac', 'bca', 'cab', 'cba']
+    for i, key in enumerate(keys):
+        m.put(key, i, ttl=5 if i % 2 == 0 else None)
+
+    seen = []
+    iterator = m.keys()
+    seen.append(next(iterator))
+    clock.now += 10
+    for key in keys[::2]:
+        m.get(key)
+    seen.extend(iterator)
+    assert set(seen) >= set(keys[1::2])
@@ -0,0 +1,210 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6: HashMap Implementation
+# Description: Multithreaded stress benchmark for the lock-striped ConcurrentHashMap,
+#              against hash_map_sc.HashMap behind a single global lock. Every thread
+#              puts its own keys, reads them back together with keys of other threads,
+#              and removes half of them; the final size is checked, so each run is also
+#              a stress test. The 'cpu' workload is pure map operations, which only
+#              scale on free-threaded builds of CPython. The 'io' workload sleeps for
+#              --io-delay seconds after every --io-every operations, as a thread-pool
+#              server waiting on its sockets would, which scales on regular CPython too.
+#
+# Usage:       python thread_benchmark.py [--maps striped locked] [--threads 1 2 4 8]
+#                                         [--workloads cpu io] [--keys 20000]
+#                                         [--stripes 16] [--json results.json]
+
+import argparse
+import json
+import platform
+import random
+import sys
+import sysconfig
+import threading
+import time
+
+from a6_include import hash_function_2
+from benchmark import random_keys
+from hash_map_concurrent import STRIPES, ConcurrentHashMap
+from hash_map_sc import HashMap
+
+
+class LockedMap:
+    """hash_map_sc.HashMap with every operation serialized by one global lock."""
+    __slots__ = ('_map', '_lock')
+
+    def __init__(self, function) -> None:
+        self._map = HashMap(11, function)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._map.remove(key)
+
+    def get_size(self) -> int:
+        with self._lock:
+            return self._map.get_size()
+
+
+# Name -> factory taking the hash function and the number of stripes
+MAPS = {
+    'striped': lambda function, stripes: ConcurrentHashMap(11, function, stripes),
+    'locked': lambda function, stripes: LockedMap(function),
+}
+
+WORKLOADS = ('cpu', 'io')
+
+DEFAULT_THREADS = (1, 2, 4, 8)
+
+
+def gil_enabled() -> bool:
+    """Return whether this interpreter runs with the GIL."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    if is_gil_enabled is not None:
+        return is_gil_enabled()
+    return not sysconfig.get_config_var('Py_GIL_DISABLED')
+
+
+def worker(m, own: list, others: list, io_every: int, io_delay: float, start) -> None:
+    """
+    One thread's share of the work: put its own keys, get each of them along with a key
+    of another thread, then remove every other one of its keys. With io_every, sleep
+    io_delay seconds after every io_every operations.
+    """
+    put, get, remove = m.put, m.get, m.remove
+    sleep = time.sleep
+    start.wait()
+
+    done = 0
+    for phase in range(3):
+        for i, key in enumerate(own):
+            if phase == 0:
+                put(key, i)
+            elif phase == 1:
+                if get(key) != i:
+                    raise AssertionError('lost the value of ' + key)
+                get(others[i])
+            elif i % 2 == 0:
+                remove(key)
+            done += 1
+            if io_every and done % io_every == 0:
+                sleep(io_delay)
+
+
+def run(map_name: str, workload: str, threads: int, keys: int, stripes: int = STRIPES,
+        io_every: int = 50, io_delay: float = 0.0005, seed: int = 261) -> dict:
+    """
+    Run one workload with the given number of threads, each with its own keys, against
+    one map and return its results. Raises AssertionError if the map lost an update.
+    """
+    per_thread = keys // threads
+    pool = random_keys(per_thread * threads, random.Random(seed))
+    shares = [pool[i * per_thread:(i + 1) * per_thread] for i in range(threads)]
+    m = MAPS[map_name](hash_function_2, stripes)
+
+    if workload == 'cpu':
+        io_every = 0
+    start = threading.Barrier(threads + 1)
+    errors = []
+
+    def target(n: int) -> None:
+        try:
+            worker(m, shares[n], shares[(n + 1) % threads], io_every, io_delay, start)
+        except Exception as error:
+            errors.append(error)
+
+    pool_threads = [threading.Thread(target=target, args=(n,)) for n in range(threads)]
+    for thread in pool_threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in pool_threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    if errors:
+        raise errors[0]
+    removed = (per_thread + 1) // 2
+    expected = threads * (per_thread - removed)
+    if m.get_size() != expected:
+        raise AssertionError(f'size {m.get_size()} after the run, expected {expected}')
+
+    # A put and two gets per key, and a remove for every other key
+    ops = threads * (3 * per_thread + removed)
+    return {
+        'map': map_name,
+        'workload': workload,
+        'threads': threads,
+        'keys': per_thread * threads,
+        'ops': ops,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(ops / elapsed) if elapsed else None,
+    }
+
+
+def benchmark(maps=tuple(MAPS), workloads=WORKLOADS, threads=DEFAULT_THREADS, keys: int = 20000,
+              stripes: int = STRIPES, io_every: int = 50, io_delay: float = 0.0005,
+              seed: int = 261, log=None) -> list:
+    """
+    Run every workload at every thread count against every map and return the result
+    dicts, each with its speedup over the same map and workload on one thread.
+    """
+    results = []
+    for workload in workloads:
+        for name in maps:
+            base = None
+            for count in threads:
+                result = run(name, workload, count, keys, stripes, io_every, io_delay, seed)
+                base = base or result['ops_per_sec']
+                result['speedup'] = round(result['ops_per_sec'] / base, 2)
+                results.append(result)
+                if log is not None:
+                    log(result)
+    return results
+
+
+def print_result(r: dict) -> None:
+    """Print one result as a row of the results table."""
+    print(f"{r['workload']:<9}{r['map']:<9}{r['threads']:>8}{r['ops_per_sec']:>12}"
+          f"{r['speedup']:>9}", flush=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Stress the concurrent hash map with threads.')
+    parser.add_argument('--maps', nargs='+', choices=sorted(MAPS), default=list(MAPS))
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--threads', type=int, nargs='+', default=DEFAULT_THREADS)
+    parser.add_argument('--keys', type=int, default=20000, help='keys shared out among the threads')
+    parser.add_argument('--stripes', type=int, default=STRIPES)
+    parser.add_argument('--io-every', type=int, default=50, help='operations between waits in the io workload')
+    parser.add_argument('--io-delay', type=float, default=0.0005, help='seconds of each wait')
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--json', metavar='PATH', help='also write the results to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    gil = gil_enabled()
+    print(f"Python {platform.python_version()}, GIL {'enabled' if gil else 'disabled'}")
+    print(f"{'workload':<9}{'map':<9}{'threads':>8}{'ops/sec':>12}{'speedup':>9}")
+    results = benchmark(args.maps, args.workloads, args.threads, args.keys, args.stripes,
+                        args.io_every, args.io_delay, args.seed, print_result)
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({
+                'python': sys.version,
+                'platform': platform.platform(),
+                'gil': gil,
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'results': results,
+            }, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()